@@ -23,6 +23,7 @@ __description__ = "Transform your resume to match job descriptions with AI-power
 """Test package for Enhanced CV Creator Agent"""
 
 # tests/test_nodes.py
+import asyncio
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from cv_agent.nodes import (
@@ -34,6 +35,15 @@ from cv_agent.nodes import (
     final_analysis_node
 )
 from cv_agent.state import CVCreatorState
+from cv_agent.schemas import ResumeAnalysis, JDAnalysis
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, HumanMessage
+from tenacity import wait_none
+
+
+def _structured(parsed, raw="", parsing_error=None):
+    """Response of an analyzer bound with with_structured_output(..., include_raw=True)"""
+    return {"raw": AIMessage(content=raw), "parsed": parsed, "parsing_error": parsing_error}
 
 
 class TestEnhancedNodes:
@@ -41,7 +51,7 @@ class TestEnhancedNodes:
     def test_analyze_resume_node_no_resume(self):
         """Test resume analysis node with no resume"""
         state = CVCreatorState(messages=[])
-        result = analyze_resume_node(state)
+        result = asyncio.run(analyze_resume_node(state))
         assert "error" in result
         assert "No resume uploaded" in result["error"]
     
@@ -53,7 +63,7 @@ class TestEnhancedNodes:
         )
         
         with patch('cv_agent.nodes.is_clients_initialized', return_value=False):
-            result = analyze_resume_node(state)
+            result = asyncio.run(analyze_resume_node(state))
             assert "error" in result
             assert "LLM clients not initialized" in result["error"]
     
@@ -99,14 +109,16 @@ class TestEnhancedNodes:
                 "length_appropriate": true
             }
         }'''
-        mock_client.invoke.return_value = mock_response
+        mock_client.with_structured_output.return_value.ainvoke = AsyncMock(
+            return_value=_structured(ResumeAnalysis.model_validate_json(mock_response.content))
+        )
         
         state = CVCreatorState(
             messages=[],
             uploaded_resume="John Doe\nSoftware Engineer with 5 years experience..."
         )
         
-        result = analyze_resume_node(state)
+        result = asyncio.run(analyze_resume_node(state))
         
         # Assertions for enhanced features
         assert "resume_analysis" in result
@@ -169,14 +181,16 @@ class TestEnhancedNodes:
             "deal_breakers": ["Less than 5 years experience", "No Python experience"],
             "company_culture": "Fast-paced startup environment"
         }'''
-        mock_client.invoke.return_value = mock_response
+        mock_client.with_structured_output.return_value.ainvoke = AsyncMock(
+            return_value=_structured(JDAnalysis.model_validate_json(mock_response.content))
+        )
         
         state = CVCreatorState(
             messages=[],
             job_description="Senior Software Engineer position requiring Python and Django..."
         )
         
-        result = analyze_job_description_node(state)
+        result = asyncio.run(analyze_job_description_node(state))
         
         assert "jd_analysis" in result
         assert result["current_step"] == "jd_analyzed"
@@ -242,7 +256,10 @@ class TestEnhancedNodes:
                 }
             ]
         }'''
-        mock_client.invoke.return_value = mock_response
+        # The node requests the analysis as two concurrent halves - each schema keeps its own fields
+        mock_client.with_structured_output.side_effect = lambda schema, include_raw: Mock(
+            ainvoke=AsyncMock(return_value=_structured(schema.model_validate_json(mock_response.content)))
+        )
         
         state = CVCreatorState(
             messages=[],
@@ -250,7 +267,7 @@ class TestEnhancedNodes:
             jd_analysis={"job_title": "Senior Software Engineer"}
         )
         
-        result = match_analysis_node(state)
+        result = asyncio.run(match_analysis_node(state))
         
         # Test enhanced match analysis results
         assert "match_analysis" in result
@@ -302,7 +319,7 @@ class TestEnhancedNodes:
                 "Improved bullet point formatting"
             ]
         }'''
-        mock_client.invoke.return_value = mock_response
+        mock_client.ainvoke = AsyncMock(return_value=mock_response)
         
         state = CVCreatorState(
             messages=[],
@@ -311,7 +328,7 @@ class TestEnhancedNodes:
             match_analysis={"gaps_identified": ["Missing Django", "No leadership"]}
         )
         
-        result = generate_improved_cv_node(state)
+        result = asyncio.run(generate_improved_cv_node(state))
         
         # Test change tracking features
         assert "improved_cv" in result
@@ -322,6 +339,490 @@ class TestEnhancedNodes:
         assert len(result["changes_made"]) == 2
         assert result["changes_made"][0]["addresses_gap"] == "Missing Django framework experience"
         assert "Django" in result["keywords_added"]
+    
+    @pytest.mark.parametrize("feedback", ["looks good", "LGTM", "Approved.", "ship it!", "no changes needed"])
+    @patch('cv_agent.nodes.is_clients_initialized', return_value=True)
+    @patch('cv_agent.nodes.get_client_generator')
+    def test_apply_user_feedback_node_trivial(self, mock_client_func, mock_initialized, feedback):
+        """Plain approvals finalize the improved CV without an LLM call and keep the user's text"""
+        state = CVCreatorState(messages=[], improved_cv="IMPROVED CV", user_feedback=feedback)
+        
+        result = asyncio.run(apply_user_feedback_node(state))
+        
+        mock_client_func.assert_not_called()
+        assert result["final_cv"] == "IMPROVED CV"
+        assert result["trivial_feedback"] is True
+        assert result["user_feedback_text"] == feedback
+        assert result["current_step"] == "cv_finalized"
+    
+    @pytest.mark.parametrize("feedback", ["looks good but add Docker", "ok, shorten the summary", "make it one page"])
+    @patch('cv_agent.nodes.is_clients_initialized', return_value=True)
+    @patch('cv_agent.nodes.get_client_generator')
+    def test_apply_user_feedback_node_substantive(self, mock_client_func, mock_initialized, feedback):
+        """Anything beyond a plain approval still goes to the LLM"""
+        mock_client = Mock()
+        mock_client_func.return_value = mock_client
+        mock_response = Mock()
+        mock_response.content = '{"final_resume_text": "UPDATED CV", "feedback_changes": [], "feedback_not_applied": []}'
+        mock_client.ainvoke = AsyncMock(return_value=mock_response)
+        
+        state = CVCreatorState(messages=[], improved_cv="IMPROVED CV", user_feedback=feedback)
+        
+        result = asyncio.run(apply_user_feedback_node(state))
+        
+        mock_client.ainvoke.assert_awaited_once()
+        assert result["final_cv"] == "UPDATED CV"
+        assert result["trivial_feedback"] is False
+        assert result["user_feedback_text"] == feedback
+
+
+class TestParseRetry:
+    
+    @patch('cv_agent.nodes.wait_exponential', return_value=wait_none())
+    @patch('cv_agent.nodes.get_client_analyzer')
+    def test_structured_retry_echoes_rejected_output(self, mock_client_func, mock_wait):
+        """The retry shows the model its rejected response, then the error"""
+        from cv_agent.nodes import _invoke_structured
+        ainvoke = AsyncMock(side_effect=[
+            _structured(None, raw='{"job_title": ', parsing_error=OutputParserException("truncated JSON")),
+            _structured(JDAnalysis(job_title="Engineer"))
+        ])
+        mock_client_func.return_value.with_structured_output.return_value.ainvoke = ainvoke
+        
+        result = asyncio.run(_invoke_structured(JDAnalysis, [HumanMessage(content="Analyze")]))
+        
+        assert result.job_title == "Engineer"
+        retry_messages = ainvoke.await_args_list[1].args[0]
+        assert isinstance(retry_messages[-2], AIMessage)
+        assert retry_messages[-2].content == '{"job_title": '
+        assert "truncated JSON" in retry_messages[-1].content
+    
+    @patch('cv_agent.nodes.wait_exponential', return_value=wait_none())
+    @patch('cv_agent.nodes.get_client_generator')
+    def test_generator_retry_echoes_rejected_output(self, mock_client_func, mock_wait):
+        """A generator response that fails validation is sent back with the error"""
+        from cv_agent.nodes import _generate_validated
+        from cv_agent.schemas import CVGeneration
+        ainvoke = AsyncMock(side_effect=[
+            Mock(content='{"improved_resume_text": ""}'),
+            Mock(content='{"improved_resume_text": "IMPROVED CV"}')
+        ])
+        mock_client_func.return_value.ainvoke = ainvoke
+        
+        result = asyncio.run(_generate_validated(CVGeneration, [HumanMessage(content="Improve")]))
+        
+        assert result.improved_resume_text == "IMPROVED CV"
+        retry_messages = ainvoke.await_args_list[1].args[0]
+        assert retry_messages[-2].content == '{"improved_resume_text": ""}'
+        assert "improved_resume_text" in retry_messages[-1].content
+
+
+class TestFinalAnalysisCache:
+    
+    def setup_method(self):
+        from cv_agent import nodes
+        nodes._FINAL_ANALYSIS_CACHE.clear()
+    
+    @staticmethod
+    def _state(final_cv: str) -> CVCreatorState:
+        return CVCreatorState(
+            messages=[],
+            final_cv=final_cv,
+            jd_analysis={"job_title": "Senior Software Engineer"},
+            ats_compliance_score=0
+        )
+    
+    @patch('cv_agent.nodes.DocumentParser.cached_ats_compliance_score', return_value={"score": 80, "feedback": []})
+    @patch('cv_agent.nodes.get_client_status', return_value=(True, "openai"))
+    @patch('cv_agent.nodes.is_clients_initialized', return_value=True)
+    @patch('cv_agent.nodes.get_client_analyzer')
+    def test_repeat_run_served_from_cache(self, mock_client_func, mock_initialized, mock_status, mock_ats):
+        """An identical final analysis skips the LLM call; a changed CV does not"""
+        from cv_agent.schemas import FinalAnalysis
+        ainvoke = AsyncMock(return_value=_structured(FinalAnalysis.model_validate({
+            "final_match_analysis": {"overall_match_percentage": 85},
+            "gaps_analysis": {"gaps_addressed": [{"gap": "Docker"}]}
+        })))
+        mock_client_func.return_value.with_structured_output.return_value.ainvoke = ainvoke
+        
+        first = asyncio.run(final_analysis_node(self._state("FINAL CV")))
+        second = asyncio.run(final_analysis_node(self._state("FINAL CV")))
+        
+        assert ainvoke.await_count == 1
+        assert second == first
+        assert second["final_ats_score"] == 80
+        assert second["ats_improvement"] == 80
+        
+        asyncio.run(final_analysis_node(self._state("EDITED FINAL CV")))
+        assert ainvoke.await_count == 2
+    
+    @patch('cv_agent.nodes.DocumentParser.cached_ats_compliance_score', return_value={"score": 80, "feedback": []})
+    @patch('cv_agent.nodes.get_client_status', return_value=(True, "openai"))
+    @patch('cv_agent.nodes.is_clients_initialized', return_value=True)
+    @patch('cv_agent.nodes.get_client_analyzer')
+    def test_failed_call_not_cached(self, mock_client_func, mock_initialized, mock_status, mock_ats):
+        """A failed final analysis is retried on the next run"""
+        ainvoke = AsyncMock(side_effect=RuntimeError("provider error"))
+        mock_client_func.return_value.with_structured_output.return_value.ainvoke = ainvoke
+        
+        for _ in range(2):
+            assert "provider error" in asyncio.run(final_analysis_node(self._state("FINAL CV")))["error"]
+        
+        assert ainvoke.await_count == 2
+
+
+# tests/test_json_utils.py
+import json
+from cv_agent.json_utils import robust_json_loads
+
+
+class TestRobustJsonLoads:
+    
+    def test_bare_object(self):
+        """Plain JSON parses as-is"""
+        assert robust_json_loads('{"score": 65}') == {"score": 65}
+    
+    def test_fenced_output(self):
+        """```json and bare ``` fences, including trailing whitespace after the fence"""
+        assert robust_json_loads('```json\n{"score": 65}\n```') == {"score": 65}
+        assert robust_json_loads('```\n{"score": 65}\n```  \n') == {"score": 65}
+    
+    def test_surrounding_prose(self):
+        """Prose before and after the object is ignored"""
+        assert robust_json_loads('Here is the analysis:\n{"score": 65}\nHope this helps!') == {"score": 65}
+    
+    def test_trailing_prose_with_braces(self):
+        """A '}' in prose after the object falls back to the brace-balanced block"""
+        text = '{"score": 65, "detail": {"format": 15}} Note: use {placeholders} sparingly.'
+        assert robust_json_loads(text) == {"score": 65, "detail": {"format": 15}}
+    
+    def test_braces_inside_strings(self):
+        """Braces inside string values don't end the object"""
+        text = '{"feedback": ["Avoid {curly} templates", "}"]} trailing {'
+        assert robust_json_loads(text) == {"feedback": ["Avoid {curly} templates", "}"]}
+    
+    def test_escaped_quotes(self):
+        """Escaped quotes don't toggle the in-string state of the brace scan"""
+        text = '{"summary": "Led the \\"{core}\\" team"} and {more}'
+        assert robust_json_loads(text) == {"summary": 'Led the "{core}" team'}
+    
+    def test_top_level_array_rejected(self):
+        """An array of objects is rejected instead of silently returning its first item"""
+        with pytest.raises(json.JSONDecodeError):
+            robust_json_loads('[{"score": 65}, {"score": 70}]')
+        with pytest.raises(json.JSONDecodeError):
+            robust_json_loads('```json\n[\n  {"score": 65}\n]\n```')
+    
+    def test_no_object_rejected(self):
+        """Responses without a JSON object raise JSONDecodeError"""
+        for text in ("I cannot score this resume.", "[1, 2, 3]", '{"score": 65'):
+            with pytest.raises(json.JSONDecodeError):
+                robust_json_loads(text)
+
+
+# tests/test_edges.py
+from langgraph.graph import StateGraph, START, END as GRAPH_END
+from cv_agent.edges import (
+    should_continue,
+    route_node,
+    END,
+    ANALYZE_BOTH,
+    ANALYZE_JD,
+    MATCH,
+    GEN_CV,
+    APPLY_FB,
+    FINAL,
+)
+from cv_agent.state import BIT_RESUME, BIT_JD, BIT_MATCH, BIT_CV, BIT_FEEDBACK
+
+
+class TestRouting:
+    
+    # current_step -> (bit its producer sets, node should_continue routes to)
+    ROUTES = [
+        ("resume_analyzed", BIT_RESUME, ANALYZE_JD),
+        ("jd_analyzed", BIT_JD, MATCH),
+        ("match_analyzed", BIT_MATCH, GEN_CV),
+        ("cv_generated", BIT_CV, APPLY_FB),
+        ("cv_finalized", BIT_FEEDBACK, FINAL),
+    ]
+    
+    def test_upload_routes_to_analysis(self):
+        """A fresh upload with both inputs enters the analysis; a missing input ends the run"""
+        state = CVCreatorState(
+            uploaded_resume="resume", job_description="jd", current_step="upload", clients_ready=True
+        )
+        assert should_continue(state) == ANALYZE_BOTH
+        assert should_continue(state.model_copy(update={"job_description": None})) == END
+    
+    @pytest.mark.parametrize("step,bit,next_node", ROUTES)
+    def test_step_routes_when_bit_set(self, step, bit, next_node):
+        """Each step continues to its successor once its producer's bit is set"""
+        state = CVCreatorState(current_step=step, completed_steps=bit, clients_ready=True)
+        assert should_continue(state) == next_node
+    
+    @pytest.mark.parametrize("step,bit,next_node", ROUTES)
+    def test_step_ends_without_bit(self, step, bit, next_node):
+        """A step whose producer bit is missing (other bits set) ends the run"""
+        state = CVCreatorState(current_step=step, completed_steps=~bit & 0x3F, clients_ready=True)
+        assert should_continue(state) == END
+    
+    @pytest.mark.parametrize("step,bit,next_node", ROUTES)
+    def test_error_or_clients_not_ready_ends(self, step, bit, next_node):
+        """An error or unconfigured clients end the run even with the bit set"""
+        state = CVCreatorState(current_step=step, completed_steps=bit, clients_ready=True, error="boom")
+        assert should_continue(state) == END
+        state = CVCreatorState(current_step=step, completed_steps=bit, clients_ready=False)
+        assert should_continue(state) == END
+    
+    def test_unknown_and_terminal_steps_end(self):
+        """Steps outside the route table end the run"""
+        for step in ("", "analysis_complete", "bogus"):
+            assert should_continue(CVCreatorState(current_step=step, completed_steps=0x3F, clients_ready=True)) == END
+    
+    def test_route_node_goto(self):
+        """route_node continues only when the update carries every required bit, no error and ready clients"""
+        def run(update, clients_ready=True):
+            async def node(state):
+                return update
+            
+            state = CVCreatorState(clients_ready=clients_ready)
+            return asyncio.run(route_node(node, BIT_RESUME | BIT_JD, MATCH)(state))
+        
+        command = run({"completed_steps": BIT_RESUME | BIT_JD})
+        assert command.goto == MATCH
+        assert command.update == {"completed_steps": BIT_RESUME | BIT_JD}
+        assert run({"completed_steps": BIT_RESUME}).goto == GRAPH_END
+        assert run({"completed_steps": BIT_RESUME | BIT_JD, "error": "boom"}).goto == GRAPH_END
+        assert run({"completed_steps": BIT_RESUME | BIT_JD}, clients_ready=False).goto == GRAPH_END
+    
+    def test_bits_accumulate_across_commands(self):
+        """completed_steps ORs together across Command updates instead of being overwritten"""
+        seen = []
+        
+        async def first(state):
+            return {"completed_steps": BIT_RESUME, "current_step": "resume_analyzed"}
+        
+        async def second(state):
+            seen.append(state.completed_steps)
+            return {"completed_steps": BIT_JD, "current_step": "jd_analyzed"}
+        
+        graph = StateGraph(CVCreatorState)
+        graph.add_node("first", route_node(first, BIT_RESUME, "second"), destinations=("second", GRAPH_END))
+        graph.add_node("second", route_node(second, BIT_JD, GRAPH_END), destinations=(GRAPH_END,))
+        graph.add_edge(START, "first")
+        
+        result = asyncio.run(graph.compile().ainvoke(CVCreatorState(clients_ready=True)))
+        
+        assert seen == [BIT_RESUME]
+        assert result["completed_steps"] == BIT_RESUME | BIT_JD
+        assert result["current_step"] == "jd_analyzed"
+
+
+# tests/test_document_parser.py
+import io
+from docx import Document
+from cv_agent.document_parser import DocumentParser
+
+
+class TestDocxExtraction:
+    
+    @staticmethod
+    def _sample_docx() -> bytes:
+        """Resume-like DOCX with tabs, line breaks, an empty paragraph and a trailing table"""
+        doc = Document()
+        doc.add_paragraph("JOHN DOE")
+        contact = doc.add_paragraph().add_run("john@example.com")
+        contact.add_tab()
+        contact.add_text("+1 555 0100")
+        doc.add_paragraph("")
+        summary = doc.add_paragraph().add_run("Software Engineer")
+        summary.add_break()
+        summary.add_text("Python\tDjango")
+        
+        table = doc.add_table(rows=2, cols=2)
+        table.cell(0, 0).text = "Skill"
+        table.cell(0, 1).text = "Years"
+        table.cell(1, 0).text = "Python"
+        table.cell(1, 1).text = "5"
+        table.cell(1, 1).add_paragraph("(production)")
+        
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+    
+    def test_streaming_extractor_matches_python_docx(self):
+        """The default iterparse extractor yields the same text as the python-docx path"""
+        content = self._sample_docx()
+        
+        streamed = DocumentParser.extract_text_from_docx(content)
+        reference = DocumentParser.extract_text_from_docx(content, use_python_docx=True)
+        
+        assert streamed == reference
+        assert "john@example.com\t+1 555 0100" in streamed
+        assert "Software Engineer\nPython\tDjango" in streamed
+        assert "[TABLE]\nSkill | Years\nPython | 5\n(production)\n[/TABLE]" in streamed
+
+    def test_text_box_and_mid_document_table(self):
+        """Text boxes are dropped (not duplicated from mc:Fallback) and tables stay in document order"""
+        from docx.oxml import parse_xml
+
+        textbox = (
+            '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+            ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+            ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+            ' xmlns:v="urn:schemas-microsoft-com:vml">'
+            '<mc:AlternateContent>'
+            '<mc:Choice Requires="wps"><wps:txbx><w:txbxContent>'
+            '<w:p><w:r><w:t>SKILLS: Python</w:t></w:r></w:p>'
+            '</w:txbxContent></wps:txbx></mc:Choice>'
+            '<mc:Fallback><w:pict><v:textbox><w:txbxContent>'
+            '<w:p><w:r><w:t>SKILLS: Python</w:t></w:r></w:p>'
+            '</w:txbxContent></v:textbox></w:pict></mc:Fallback>'
+            '</mc:AlternateContent></w:r>'
+        )
+        doc = Document()
+        intro = doc.add_paragraph()
+        intro.add_run("Intro ")
+        intro._p.append(parse_xml(textbox))
+        intro.add_run("tail")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Python"
+        table.cell(0, 1).text = "5"
+        doc.add_paragraph("EXPERIENCE")
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        content = buffer.getvalue()
+
+        streamed = DocumentParser.extract_text_from_docx(content)
+        reference = DocumentParser.extract_text_from_docx(content, use_python_docx=True)
+
+        assert streamed == "Intro tail\n\n[TABLE]\nPython | 5\n[/TABLE]\nEXPERIENCE"
+        assert reference.startswith("Intro tail\nEXPERIENCE")
+
+
+class TestATSCache:
+    
+    def setup_method(self):
+        from cv_agent import document_parser
+        document_parser._ATS_CACHE.clear()
+    
+    @patch('cv_agent.clients.get_client_status', return_value=(True, "openai"))
+    @patch('cv_agent.document_parser.DocumentParser.calculate_ats_compliance_score')
+    def test_llm_fallback_not_cached(self, mock_score, mock_status):
+        """A rule-based fallback after a failed LLM call is recomputed on the next call"""
+        mock_score.return_value = {"score": 60, "feedback": [], "llm_failed": True}
+        DocumentParser.cached_ats_compliance_score("resume text")
+        DocumentParser.cached_ats_compliance_score("resume text")
+        assert mock_score.call_count == 2
+    
+    @patch('cv_agent.clients.get_client_status', return_value=(True, "openai"))
+    @patch('cv_agent.document_parser.DocumentParser.calculate_ats_compliance_score')
+    def test_hits_survive_eviction(self, mock_score, mock_status):
+        """Eviction is least-recently-used: a text that keeps getting hit stays cached"""
+        from cv_agent.document_parser import _ATS_CACHE_SIZE
+        mock_score.return_value = {"score": 70, "feedback": []}
+        
+        DocumentParser.cached_ats_compliance_score("hot resume")
+        for i in range(_ATS_CACHE_SIZE):
+            DocumentParser.cached_ats_compliance_score(f"resume {i}")
+            DocumentParser.cached_ats_compliance_score("hot resume")
+        
+        assert mock_score.call_count == _ATS_CACHE_SIZE + 1
+
+
+# tests/test_clients.py
+from cv_agent.clients import _PerLoopTransport
+
+
+class TestPerLoopTransport:
+
+    def test_pool_per_event_loop(self):
+        """Each asyncio.run() gets its own pool, reused within that loop"""
+        transport = _PerLoopTransport()
+
+        async def pools():
+            return transport._transport(), transport._transport()
+
+        first, same = asyncio.run(pools())
+        second, _ = asyncio.run(pools())
+
+        assert first is same
+        assert second is not first
+
+
+# tests/test_agent.py
+from cv_agent.agent import run_cv_batch
+from cv_agent.schemas import SkillsExperienceMatch, FinalAnalysis
+
+
+# Minimal valid structured outputs; every other field falls back to its default
+_STUB_OUTPUTS = {
+    SkillsExperienceMatch: {"overall_match_percentage": 60, "gaps_identified": [{"gap": "Docker"}]},
+    FinalAnalysis: {"final_match_analysis": {"overall_match_percentage": 85}, "gaps_analysis": {}},
+}
+
+
+def _stub_analyzer():
+    """Analyzer whose structured calls return a valid schema instance, failing on a FAIL resume"""
+    def bind(schema, include_raw):
+        async def ainvoke(messages):
+            if any("FAIL" in message.content for message in messages):
+                raise RuntimeError("provider error")
+            return _structured(schema.model_validate(_STUB_OUTPUTS.get(schema, {})))
+        return Mock(ainvoke=AsyncMock(side_effect=ainvoke))
+
+    analyzer = Mock()
+    analyzer.with_structured_output.side_effect = bind
+    return analyzer
+
+
+def _stub_generator():
+    """Generator that streams a valid CVGeneration document in two chunks"""
+    async def astream(messages):
+        for part in ('{"improved_resume_text": "IMPROVED CV", ', '"keywords_added": ["Docker"]}'):
+            yield Mock(content=part)
+
+    generator = Mock()
+    generator.astream = astream
+    generator.ainvoke = AsyncMock(return_value=Mock(content='{"improved_resume_text": "IMPROVED CV"}'))
+    return generator
+
+
+class TestRunCVBatch:
+
+    @pytest.fixture(autouse=True)
+    def stub_clients(self):
+        with patch('cv_agent.agent.is_clients_initialized', return_value=True), \
+             patch('cv_agent.nodes.is_clients_initialized', return_value=True), \
+             patch('cv_agent.nodes.get_client_analyzer', return_value=_stub_analyzer()), \
+             patch('cv_agent.nodes.get_client_generator', return_value=_stub_generator()), \
+             patch('cv_agent.nodes.DocumentParser.cached_ats_compliance_score',
+                   return_value={"score": 70, "feedback": []}):
+            yield
+
+    def test_every_pair_completes(self):
+        """Each (resume, JD) pair runs the whole pipeline independently"""
+        pairs = [(f"Resume {i}", f"Job description {i}") for i in range(3)]
+
+        results = asyncio.run(run_cv_batch(pairs, max_concurrency=2))
+
+        assert len(results) == 3
+        for result in results:
+            assert result["current_step"] == "analysis_complete"
+            assert result.get("error") is None
+            assert result["final_cv"] == "IMPROVED CV"
+            assert result["final_ats_score"] == 70
+
+    def test_failing_pair_does_not_abort_batch(self):
+        """A pair whose node fails ends in an error state; the other pairs still complete"""
+        pairs = [("Resume 0", "Job description 0"), ("FAIL resume", "Job description 1"), ("Resume 2", "Job description 2")]
+
+        results = asyncio.run(run_cv_batch(pairs))
+
+        assert [result["current_step"] for result in results] == ["analysis_complete", "upload", "analysis_complete"]
+        assert "provider error" in results[1]["error"]
+        assert results[0].get("error") is None and results[2].get("error") is None
 
 
 if __name__ == "__main__":
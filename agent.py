@@ -1,8 +1,20 @@
+import functools
+from typing import Any, Dict, List, Sequence, Tuple
+
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, START, END
-from cv_agent.state import CVCreatorState
+from cv_agent.clients import is_clients_initialized
+from cv_agent.state import (
+    CVCreatorState,
+    BIT_RESUME,
+    BIT_JD,
+    BIT_MATCH,
+    BIT_CV,
+    BIT_FEEDBACK,
+)
 from cv_agent.nodes import (
-    analyze_resume_node,
+    analyze_all_node,
+    analyze_both_node,
     analyze_job_description_node,
     match_analysis_node,
     generate_improved_cv_node,
@@ -11,89 +23,119 @@ from cv_agent.nodes import (
 )
 from cv_agent.edges import (
     should_continue,
-    after_resume_analysis,
-    after_jd_analysis,
-    after_match_analysis,
-    after_cv_generation,
-    after_feedback_application,
-    after_final_analysis
+    route_node,
+    ANALYZE_ALL,
+    ANALYZE_BOTH,
+    ANALYZE_JD,
+    MATCH,
+    GEN_CV,
+    APPLY_FB,
+    FINAL,
 )
+from cv_agent.edges import END as ROUTE_END
 
 
-def build_cv_agent(local_memory=True):
-    """Build the CV Creator Agent using LangGraph"""
+@functools.cache
+def build_cv_agent(local_memory=True, batched=False):
+    """Build the CV Creator Agent using LangGraph
     
-    # Create the state graph
-    workflow = StateGraph(CVCreatorState)
+    By default a fresh upload analyzes resume and JD concurrently, then runs the
+    (split, concurrent) match analysis. batched=True fuses all three into one LLM
+    call instead - fewer round-trips, but the single response has to fit the whole
+    verbatim resume extraction within the analyzer's max_tokens, so long resumes
+    can be truncated.
     
-    # Add nodes
-    workflow.add_node("analyze_resume", analyze_resume_node)
-    workflow.add_node("analyze_jd", analyze_job_description_node)
-    workflow.add_node("match_analysis", match_analysis_node)
-    workflow.add_node("generate_cv", generate_improved_cv_node)
-    workflow.add_node("apply_feedback", apply_user_feedback_node)
-    workflow.add_node("final_analysis", final_analysis_node)
+    Cached per process: the graph is static, so repeat calls return the same
+    compiled agent (and checkpointer) instead of re-validating the topology.
+    """
     
-    # Set entry point
-    workflow.add_edge(START, "analyze_resume")
+    # Create the state graph
+    workflow = StateGraph(CVCreatorState)
     
-    # Add deterministic edges between nodes
-    workflow.add_conditional_edges(
-        "analyze_resume",
-        after_resume_analysis,
-        {
-            "analyze_jd": "analyze_jd",
-            "END": END
-        }
+    # Add (async) nodes - each one routes itself to the next step (or END) via Command
+    if batched:
+        workflow.add_node(
+            ANALYZE_ALL,
+            route_node(analyze_all_node, BIT_RESUME | BIT_JD | BIT_MATCH, GEN_CV),
+            destinations=(GEN_CV, END)
+        )
+    else:
+        workflow.add_node(
+            ANALYZE_BOTH,
+            route_node(analyze_both_node, BIT_RESUME | BIT_JD, MATCH),
+            destinations=(MATCH, END)
+        )
+    # Standalone JD analysis stays registered for re-entry at "resume_analyzed"
+    workflow.add_node(
+        ANALYZE_JD,
+        route_node(analyze_job_description_node, BIT_JD, MATCH),
+        destinations=(MATCH, END)
     )
-    
-    workflow.add_conditional_edges(
-        "analyze_jd",
-        after_jd_analysis,
-        {
-            "match_analysis": "match_analysis",
-            "END": END
-        }
+    workflow.add_node(
+        MATCH,
+        route_node(match_analysis_node, BIT_MATCH, GEN_CV),
+        destinations=(GEN_CV, END)
     )
-    
-    workflow.add_conditional_edges(
-        "match_analysis",
-        after_match_analysis,
-        {
-            "generate_cv": "generate_cv",
-            "END": END
-        }
+    workflow.add_node(
+        GEN_CV,
+        route_node(generate_improved_cv_node, BIT_CV, APPLY_FB),
+        destinations=(APPLY_FB, END)
     )
-    
-    workflow.add_conditional_edges(
-        "generate_cv",
-        after_cv_generation,
-        {
-            "apply_feedback": "apply_feedback",
-            "END": END
-        }
+    workflow.add_node(
+        APPLY_FB,
+        route_node(apply_user_feedback_node, BIT_FEEDBACK, FINAL),
+        destinations=(FINAL, END)
     )
+    workflow.add_node(FINAL, final_analysis_node)
     
+    # Enter at the step the caller's state says is next (fresh upload or a re-run from the UI)
     workflow.add_conditional_edges(
-        "apply_feedback",
-        after_feedback_application,
+        START,
+        should_continue,
         {
-            "final_analysis": "final_analysis",
-            "END": END
+            # The upload route lands on whichever analysis entry node was registered above
+            ANALYZE_BOTH: ANALYZE_ALL if batched else ANALYZE_BOTH,
+            ANALYZE_JD: ANALYZE_JD,
+            MATCH: MATCH,
+            GEN_CV: GEN_CV,
+            APPLY_FB: APPLY_FB,
+            FINAL: FINAL,
+            ROUTE_END: END
         }
     )
     
-    workflow.add_conditional_edges(
-        "final_analysis",
-        after_final_analysis,
-        {
-            "END": END
-        }
-    )
+    # Always end after final analysis, even if there were issues
+    workflow.add_edge(FINAL, END)
     
     # Compile the agent with increased recursion limit
     agent = workflow.compile(
         checkpointer=MemorySaver() if local_memory else None
     )
     
-    return agent
\ No newline at end of file
+    return agent
+
+
+async def run_cv_batch(
+    pairs: Sequence[Tuple[str, str]],
+    max_concurrency: int = 8
+) -> List[Dict[str, Any]]:
+    """Run the full pipeline (no user feedback) for many (resume, job description) pairs
+    
+    Each pair is an independent graph run; abatch interleaves their LLM calls under a
+    single max_concurrency cap instead of paying every chain's round-trips back to back.
+    Batch runs are never resumed from the UI, so they use the uncheckpointed agent.
+    """
+    agent = build_cv_agent(local_memory=False)
+    clients_ready = is_clients_initialized()
+    
+    inputs = [
+        CVCreatorState(
+            uploaded_resume=resume,
+            job_description=job_description,
+            current_step="upload",
+            clients_ready=clients_ready
+        )
+        for resume, job_description in pairs
+    ]
+    
+    return await agent.abatch(inputs, config={"max_concurrency": max_concurrency, "recursion_limit": 50})
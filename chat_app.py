@@ -1,6 +1,6 @@
 import os
 import asyncio
-from typing import Optional, Dict, Any, Literal
+from typing import Optional, Dict, Any, Literal, Tuple
 from fastapi import FastAPI, Request, UploadFile, File
 from langchain_core.messages import HumanMessage
 from nicegui import run, ui, app
@@ -10,7 +10,7 @@ import logging
 from cv_agent.state import CVCreatorState
 from cv_agent.document_parser import DocumentParser
 from cv_agent.cv_generator import CVGenerator
-from cv_agent.clients import initialize_llm_clients, is_clients_initialized, get_current_provider
+from cv_agent.clients import initialize_llm_clients, is_clients_initialized, get_current_provider, get_client_status
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -29,6 +29,11 @@ def get_global_agent():
     """Get the global agent reference"""
     return _GLOBAL_AGENT
 
+def get_status_tuple() -> Tuple[Any, bool, Optional[str]]:
+    """Get (agent, clients ready, current provider) in one pass for the status endpoints"""
+    clients_ready, provider = get_client_status()
+    return _GLOBAL_AGENT, clients_ready, provider if clients_ready else None
+
 
 class CVCreatorPageData:
     def __init__(self):
@@ -72,6 +77,7 @@ class CVCreatorPageData:
         self.show_analysis_results: bool = False
         self.show_cv_editor: bool = False
         self.show_final_results: bool = False
+        self.stream_preview: str = ""  # Tail of the CV text being generated
         
         # Step tracking
         self.steps_completed = {
@@ -202,7 +208,7 @@ class Refreshables:
                                     page_data.error = None
                                     
                                     # Calculate initial ATS score
-                                    ats_analysis = DocumentParser.calculate_ats_compliance_score(text)
+                                    ats_analysis = DocumentParser.cached_ats_compliance_score(text)
                                     page_data.original_ats_score = ats_analysis["score"]
                                     page_data.ats_feedback = ats_analysis["feedback"]
                                     
@@ -386,6 +392,11 @@ class Refreshables:
                 ).props('color=primary size=lg').bind_enabled_from(
                     page_data, 'processing', backward=lambda x: not x
                 )
+                
+                # Live tail of the generator output while it streams
+                ui.label().bind_text_from(page_data, 'stream_preview').bind_visibility_from(
+                    page_data, 'processing'
+                ).classes('w-full text-xs font-mono text-gray-600 whitespace-pre-wrap mt-2')
     
     @ui.refreshable
     def cv_editor(self, page_data: CVCreatorPageData) -> None:
@@ -437,6 +448,11 @@ class Refreshables:
                         'Use As-Is',
                         on_click=lambda: self.finalize_cv(page_data, cv_editor.value, skip_feedback=True)
                     ).props('color=secondary')
+                
+                # Live tail of the generator output while it streams
+                ui.label().bind_text_from(page_data, 'stream_preview').bind_visibility_from(
+                    page_data, 'processing'
+                ).classes('w-full text-xs font-mono text-gray-600 whitespace-pre-wrap mt-2')
     
     @ui.refreshable
     def final_results(self, page_data: CVCreatorPageData) -> None:
@@ -560,11 +576,12 @@ class Refreshables:
                 uploaded_resume=page_data.uploaded_resume,
                 job_description=page_data.job_description,
                 current_step="upload",
-                processing=True
+                processing=True,
+                clients_ready=is_clients_initialized()
             )
             
             # Run comprehensive analysis
-            result = await run.io_bound(agent.invoke, initial_state, config)
+            result = await agent.ainvoke(initial_state, config)
             
             # Extract all results
             page_data.match_percentage = result.get("match_percentage")
@@ -587,6 +604,18 @@ class Refreshables:
             self.upload_section.refresh(page_data)
             self.analysis_results.refresh(page_data)
     
+    async def _run_agent_streaming(self, agent, state, config, page_data: CVCreatorPageData) -> Dict[str, Any]:
+        """Run the graph, mirroring the streamed generator output into page_data.stream_preview"""
+        result: Dict[str, Any] = {}
+        page_data.stream_preview = ""
+        async for mode, chunk in agent.astream(state, config, stream_mode=["custom", "values"]):
+            if mode == "custom":
+                page_data.stream_preview = (page_data.stream_preview + chunk)[-600:]
+            else:
+                result = chunk
+        page_data.stream_preview = ""
+        return result
+    
     async def generate_cv(self, page_data: CVCreatorPageData):
         """Generate improved CV with change tracking"""
         try:
@@ -599,8 +628,9 @@ class Refreshables:
             # Get current state and trigger CV generation
             current_state = agent.get_state(config).values
             current_state["current_step"] = "match_analyzed"
+            current_state["clients_ready"] = is_clients_initialized()
             
-            result = await run.io_bound(agent.invoke, current_state, config)
+            result = await self._run_agent_streaming(agent, current_state, config, page_data)
             
             # Extract generation results
             page_data.improved_cv = result.get("improved_cv")
@@ -632,9 +662,10 @@ class Refreshables:
             current_state["improved_cv"] = cv_content
             current_state["user_feedback"] = page_data.user_feedback if not skip_feedback else None
             current_state["current_step"] = "cv_generated"
+            current_state["clients_ready"] = is_clients_initialized()
             
             # Run through feedback application and final analysis
-            result = await run.io_bound(agent.invoke, current_state, config)
+            result = await self._run_agent_streaming(agent, current_state, config, page_data)
             
             # Extract final results
             page_data.final_cv = result.get("final_cv")
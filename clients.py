@@ -1,8 +1,70 @@
 import os
-from typing import Optional, Literal
+import asyncio
+import functools
+import weakref
+from typing import Optional, Literal, Tuple
+import httpx
+from langchain_community.cache import SQLiteCache
+from langchain_core.caches import BaseCache
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+def _build_analyzer_cache() -> Optional[BaseCache]:
+    """SQLite response cache for the analyzer clients; off unless LLM_CACHE_PATH is set"""
+    path = os.getenv("LLM_CACHE_PATH", "")
+    return SQLiteCache(database_path=path) if path else None
+
+# Opt-in: analyzer calls are deterministic extractions, so with LLM_CACHE_PATH set a
+# repeated resume/JD pair is served from disk; the generator clients stay uncached so
+# "regenerate" yields a fresh CV. The cache stores full prompts and responses (i.e. resume
+# and job description text) with no expiry and is shared by every user of the process, so
+# only enable it for single-user or fixture/demo setups and delete the file to purge it.
+# Suggested value: LLM_CACHE_PATH=.cv_agent_cache.db (already in .gitignore).
+_ANALYZER_CACHE = _build_analyzer_cache()
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """Async transport holding one connection pool per running event loop
+    
+    An async pool is bound to the loop that opened its connections, so a shared one breaks
+    ("Event loop is closed") as soon as a second asyncio.run() reuses it; each loop gets
+    its own pool instead, dropped together with the loop.
+    """
+    
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._transports = weakref.WeakKeyDictionary()
+    
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        return transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+# Keep-alive connection pools shared by every OpenAI client (analyzer, generator and any
+# reconfiguration), so node calls reuse warm TLS connections instead of re-handshaking;
+# HTTP/2 multiplexes the concurrently gathered node calls over one connection
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, max_connections=20)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=60, http2=True)
+_HTTP_ASYNC_CLIENT = httpx.AsyncClient(
+    transport=_PerLoopTransport(limits=_HTTP_LIMITS, http2=True),
+    timeout=60
+)
+
+# OpenAI caches prompt prefixes automatically; a stable prompt_cache_key per role routes
+# the match/generation/feedback/final calls, which all open with the same job-context
+# system message (prompts.JD_CONTEXT_SYSTEM), to the cache holding that prefix
+_ANALYZER_EXTRA_BODY = {"prompt_cache_key": "cv-agent-analyzer"}
+_GENERATOR_EXTRA_BODY = {"prompt_cache_key": "cv-agent-generator"}
+
 class DynamicLLMClient:
     """Dynamic LLM client that can be configured at runtime"""
     
@@ -16,30 +78,39 @@ class DynamicLLMClient:
         """Initialize clients with the specified provider and API key"""
         try:
             if provider == "openai":
+                # Structured extraction/analysis runs on the smaller model; generation keeps the large one
                 self._client_analyzer = ChatOpenAI(
                     openai_api_key=api_key,
-                    model="gpt-4o",
-                    temperature=0.1,
+                    http_client=_HTTP_CLIENT,
+                    http_async_client=_HTTP_ASYNC_CLIENT,
+                    model="gpt-4o-mini",
+                    temperature=0,
                     max_tokens=4000,
                     timeout=30,
-                    max_retries=3
+                    max_retries=3,
+                    extra_body=_ANALYZER_EXTRA_BODY,
+                    cache=_ANALYZER_CACHE
                 )
                 self._client_generator = ChatOpenAI(
                     openai_api_key=api_key,
+                    http_client=_HTTP_CLIENT,
+                    http_async_client=_HTTP_ASYNC_CLIENT,
                     model="gpt-4o",
                     temperature=0.1,
                     max_tokens=4000,
                     timeout=30,
-                    max_retries=3
+                    max_retries=3,
+                    extra_body=_GENERATOR_EXTRA_BODY
                 )
             elif provider == "gemini":
                 self._client_analyzer = ChatGoogleGenerativeAI(
                     google_api_key=api_key,
-                    model="gemini-1.5-pro",
-                    temperature=0.1,
+                    model="gemini-1.5-flash",
+                    temperature=0,
                     max_tokens=4000,
                     timeout=30,
-                    max_retries=3
+                    max_retries=3,
+                    cache=_ANALYZER_CACHE
                 )
                 self._client_generator = ChatGoogleGenerativeAI(
                     google_api_key=api_key,
@@ -83,9 +154,16 @@ class DynamicLLMClient:
 # Global client manager instance
 _client_manager = DynamicLLMClient()
 
+# Bumped on every client (re)configuration; status reads are cached per epoch
+_EPOCH = 0
+
 def initialize_llm_clients(provider: Literal["openai", "gemini"], api_key: str) -> bool:
     """Initialize LLM clients with the specified provider and API key"""
-    return _client_manager.initialize_clients(provider, api_key)
+    global _EPOCH
+    try:
+        return _client_manager.initialize_clients(provider, api_key)
+    finally:
+        _EPOCH += 1
 
 def get_client_analyzer():
     """Get the analyzer client"""
@@ -95,13 +173,22 @@ def get_client_generator():
     """Get the generator client"""
     return _client_manager.get_generator_client()
 
+@functools.lru_cache(maxsize=1)
+def _client_status_for_epoch(epoch: int) -> Tuple[bool, Optional[str]]:
+    """Probe the client manager once per configuration epoch"""
+    return _client_manager.is_initialized(), _client_manager.get_current_provider()
+
+def get_client_status() -> Tuple[bool, Optional[str]]:
+    """Get (clients initialized, current provider), cached until the clients are reconfigured"""
+    return _client_status_for_epoch(_EPOCH)
+
 def is_clients_initialized() -> bool:
     """Check if clients are initialized"""
-    return _client_manager.is_initialized()
+    return get_client_status()[0]
 
 def get_current_provider() -> Optional[str]:
     """Get the current LLM provider"""
-    return _client_manager.get_current_provider()
+    return get_client_status()[1]
 
 # For backward compatibility - these will raise errors if not initialized
 @property
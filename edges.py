@@ -1,208 +1,147 @@
-from cv_agent.state import CVCreatorState
-from cv_agent.clients import is_clients_initialized
+import functools
+from typing import Any, Awaitable, Callable, Dict
+
+from langgraph.graph import END as GRAPH_END
+from langgraph.types import Command
+
+from cv_agent.state import (
+    CVCreatorState,
+    BIT_RESUME,
+    BIT_JD,
+    BIT_MATCH,
+    BIT_CV,
+    BIT_FEEDBACK,
+)
+
+
+# Routing targets shared by the tables below and agent.py; "END" is the
+# router-side sentinel mapped to LangGraph's END when the graph is built
+END = "END"
+ANALYZE_RESUME = "analyze_resume"
+ANALYZE_JD = "analyze_jd"
+ANALYZE_BOTH = "analyze_both"
+ANALYZE_ALL = "analyze_all"
+MATCH = "match_analysis"
+GEN_CV = "generate_cv"
+APPLY_FB = "apply_feedback"
+FINAL = "final_analysis"
+
+
+# Fresh uploads are the only entry point without a producer node, so they check the inputs
+_UPLOAD_KEYS = ("uploaded_resume", "job_description")
+
+# current_step -> (completed_steps bit of the step that produced it, node to run next)
+_ROUTES = {
+    "upload": (0, ANALYZE_BOTH),
+    "resume_analyzed": (BIT_RESUME, ANALYZE_JD),
+    "jd_analyzed": (BIT_JD, MATCH),
+    "match_analyzed": (BIT_MATCH, GEN_CV),
+    "cv_generated": (BIT_CV, APPLY_FB),
+    "cv_finalized": (BIT_FEEDBACK, FINAL),
+}
+
+# Steps that need configured LLM clients to make progress
+_ANALYSIS_STEPS = frozenset(_ROUTES)
+
+
+# step -> state keys that must be populated before the step can run
+_REQUIRED_KEYS = {
+    ANALYZE_RESUME: ("uploaded_resume",),
+    ANALYZE_JD: ("job_description", "resume_analysis"),
+    ANALYZE_BOTH: ("uploaded_resume", "job_description"),
+    ANALYZE_ALL: ("uploaded_resume", "job_description"),
+    MATCH: ("resume_analysis", "jd_analysis"),
+    GEN_CV: ("match_analysis", "resume_analysis", "jd_analysis"),
+    APPLY_FB: ("improved_cv",),
+    FINAL: ("final_cv", "jd_analysis"),
+}
+
+
+# Expected workflow order; the last step has no successor
+_STEP_SEQUENCE = (
+    "upload",
+    ANALYZE_RESUME,
+    ANALYZE_JD,
+    MATCH,
+    GEN_CV,
+    APPLY_FB,
+    FINAL,
+    "analysis_complete",
+)
+_NEXT_STEP = dict(zip(_STEP_SEQUENCE, _STEP_SEQUENCE[1:]))
+
+
+# step -> state key whose absence lets the step be skipped
+# (user feedback can be skipped if no feedback provided; other steps cannot)
+_SKIPPABLE = {APPLY_FB: "user_feedback"}
 
 
 def should_continue(state: CVCreatorState) -> str:
     """Main routing logic - enhanced for better error handling and LLM client checks"""
     
     # Check for errors first
-    if state.get("error"):
-        return "END"
+    if state.error:
+        return END
     
     # Check if LLM clients are initialized for analysis steps
-    current_step = state.get("current_step", "")
-    analysis_steps = ["upload", "resume_analyzed", "jd_analyzed", "match_analyzed", "cv_generated", "cv_finalized"]
-    
-    if current_step in analysis_steps and not is_clients_initialized():
-        return "END"  # Cannot proceed without LLM clients
-    
-    # Direct routing based on what's been completed
-    if current_step == "upload":
-        if state.get("uploaded_resume") and state.get("job_description"):
-            return "analyze_resume"
-        else:
-            return "END"  # Missing required inputs
-    
-    elif current_step == "resume_analyzed":
-        if state.get("resume_analysis"):
-            return "analyze_jd"
-        else:
-            return "END"  # Resume analysis failed
-    
-    elif current_step == "jd_analyzed":
-        if state.get("jd_analysis"):
-            return "match_analysis"
-        else:
-            return "END"  # JD analysis failed
-    
-    elif current_step == "match_analyzed":
-        if state.get("match_analysis"):
-            return "generate_cv"
-        else:
-            return "END"  # Match analysis failed
-    
-    elif current_step == "cv_generated":
-        if state.get("improved_cv"):
-            return "apply_feedback"
-        else:
-            return "END"  # CV generation failed
-    
-    elif current_step == "cv_finalized":
-        if state.get("final_cv"):
-            return "final_analysis"
-        else:
-            return "END"  # CV finalization failed
-    
-    elif current_step == "analysis_complete":
-        return "END"
-    
-    else:
-        # Default case - end the graph
-        return "END"
-
-
-def after_resume_analysis(state: CVCreatorState) -> str:
-    """Route after resume analysis with enhanced validation"""
-    # Check for errors
-    if state.get("error"):
-        return "END"
-    
-    # Check if LLM clients are still available
-    if not is_clients_initialized():
-        return "END"
-    
-    # Verify resume analysis was successful
-    if not state.get("resume_analysis"):
-        return "END"
-    
-    return "analyze_jd"
-
-
-def after_jd_analysis(state: CVCreatorState) -> str:
-    """Route after job description analysis with enhanced validation"""
-    # Check for errors
-    if state.get("error"):
-        return "END"
-    
-    # Check if LLM clients are still available
-    if not is_clients_initialized():
-        return "END"
-    
-    # Verify JD analysis was successful
-    if not state.get("jd_analysis"):
-        return "END"
-    
-    return "match_analysis"
-
-
-def after_match_analysis(state: CVCreatorState) -> str:
-    """Route after match analysis with enhanced validation"""
-    # Check for errors
-    if state.get("error"):
-        return "END"
-    
-    # Check if LLM clients are still available
-    if not is_clients_initialized():
-        return "END"
-    
-    # Verify match analysis was successful and has required data
-    match_analysis = state.get("match_analysis")
-    if not match_analysis or not state.get("match_percentage"):
-        return "END"
-    
-    return "generate_cv"
-
-
-def after_cv_generation(state: CVCreatorState) -> str:
-    """Route after CV generation with enhanced validation"""
-    # Check for errors
-    if state.get("error"):
-        return "END"
-    
-    # Check if LLM clients are still available
-    if not is_clients_initialized():
-        return "END"
-    
-    # Verify CV generation was successful
-    if not state.get("improved_cv"):
-        return "END"
-    
-    return "apply_feedback"
-
-
-def after_feedback_application(state: CVCreatorState) -> str:
-    """Route after applying feedback with enhanced validation"""
-    # Check for errors
-    if state.get("error"):
-        return "END"
-    
-    # Check if LLM clients are still available for final analysis
-    if not is_clients_initialized():
-        return "END"
-    
-    # Verify feedback application was successful
-    if not state.get("final_cv"):
-        return "END"
-    
-    return "final_analysis"
-
-
-def after_final_analysis(state: CVCreatorState) -> str:
-    """Route after final analysis - always end"""
-    # Always end after final analysis, even if there were issues
-    # The final analysis should have set appropriate error states if needed
-    return "END"
+    current_step = state.current_step
+    
+    if current_step in _ANALYSIS_STEPS and not state.clients_ready:
+        return END  # Cannot proceed without LLM clients
+    
+    # Direct routing based on what's been completed; unknown and terminal steps end the graph
+    route = _ROUTES.get(current_step)
+    if route is None:
+        return END
+    
+    required_bit, next_node = route
+    if required_bit:
+        # Accepted steps stay accepted - one AND instead of re-testing their output
+        if state.completed_steps & required_bit:
+            return next_node
+    elif all(getattr(state, key) for key in _UPLOAD_KEYS):
+        return next_node
+    return END  # Previous step failed or inputs are missing
+
+
+def route_node(
+    node: Callable[[CVCreatorState], Awaitable[Dict[str, Any]]],
+    required_bits: int,
+    next_node: str
+) -> Callable[[CVCreatorState], Awaitable[Command]]:
+    """Wrap an async node so it routes itself via Command(update=..., goto=...)
+    
+    The decision is made from the update the node just produced, so no separate
+    conditional-edge router has to re-read the state afterwards.
+    """
+    
+    @functools.wraps(node)
+    async def routed(state: CVCreatorState) -> Command:
+        update = await node(state)
+        if (
+            update.get("error")
+            or not state.clients_ready
+            or update.get("completed_steps", 0) & required_bits != required_bits
+        ):
+            return Command(update=update, goto=GRAPH_END)
+        return Command(update=update, goto=next_node)
+    
+    return routed
 
 
 def validate_state_for_step(state: CVCreatorState, step: str) -> bool:
     """Validate that the state has the required data for a given step"""
-    
-    validations = {
-        "analyze_resume": lambda s: bool(s.get("uploaded_resume")),
-        "analyze_jd": lambda s: bool(s.get("job_description") and s.get("resume_analysis")),
-        "match_analysis": lambda s: bool(s.get("resume_analysis") and s.get("jd_analysis")),
-        "generate_cv": lambda s: bool(s.get("match_analysis") and s.get("resume_analysis") and s.get("jd_analysis")),
-        "apply_feedback": lambda s: bool(s.get("improved_cv")),
-        "final_analysis": lambda s: bool(s.get("final_cv") and s.get("jd_analysis"))
-    }
-    
-    validator = validations.get(step)
-    if validator:
-        return validator(state)
-    
-    return True  # Default to valid for unknown steps
+    # Unknown steps have no requirements and are treated as valid
+    return all(getattr(state, key) for key in _REQUIRED_KEYS.get(step, ()))
 
 
 def get_next_step(current_step: str) -> str:
     """Get the expected next step in the workflow"""
-    
-    step_sequence = [
-        "upload",
-        "analyze_resume", 
-        "analyze_jd",
-        "match_analysis",
-        "generate_cv",
-        "apply_feedback",
-        "final_analysis",
-        "analysis_complete"
-    ]
-    
-    try:
-        current_index = step_sequence.index(current_step)
-        if current_index < len(step_sequence) - 1:
-            return step_sequence[current_index + 1]
-    except ValueError:
-        pass  # Current step not in sequence
-    
-    return "END"
+    return _NEXT_STEP.get(current_step, END)
 
 
 def can_skip_step(state: CVCreatorState, step: str) -> bool:
     """Determine if a step can be skipped based on state"""
-    
-    # User feedback can be skipped if no feedback provided
-    if step == "apply_feedback":
-        return not bool(state.get("user_feedback"))
-    
-    # Other steps generally cannot be skipped
-    return False
\ No newline at end of file
+    # A step is skippable only if it is listed and its input is empty
+    key = _SKIPPABLE.get(step)
+    return key is not None and not getattr(state, key)
@@ -0,0 +1,56 @@
+import json
+from typing import Any, Dict
+
+import orjson
+
+
+def _balanced_object(text: str, start: int) -> str:
+    """Return the {...} block opening at text[start], matching braces outside string literals"""
+    depth = 0
+    in_string = False
+    escaped = False
+
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    raise json.JSONDecodeError("Unbalanced braces in JSON object", text, start)
+
+
+def robust_json_loads(text: str) -> Dict[str, Any]:
+    """Parse the JSON object in an LLM response, tolerating code fences and stray prose around it
+
+    1. orjson.loads on the span from the first '{' to the last '}' - one slice covers bare
+       JSON, ```json / ``` fences and surrounding prose, with no strip or fence matching
+    2. otherwise parse the brace-balanced block opening at that first '{' (prose after
+       the object that itself contains braces)
+
+    Only a top-level object is accepted: a response without one, or whose first object
+    opens a top-level array ([{...}, ...]), is rejected rather than truncated to that
+    object. orjson's JSONDecodeError subclasses json.JSONDecodeError, which is raised
+    in every failure case.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object in response", text, 0)
+    if text[:start].rstrip().endswith("["):
+        raise json.JSONDecodeError("Expected a JSON object, got an array", text, start)
+
+    try:
+        return orjson.loads(text[start:text.rfind("}") + 1])
+    except orjson.JSONDecodeError:
+        return orjson.loads(_balanced_object(text, start))
@@ -6,7 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from nicegui import app
 
 from cv_agent.agent import build_cv_agent
-from cv_agent.clients import is_clients_initialized, get_current_provider
+from cv_agent.chat_app import get_global_agent, set_global_agent, init_cv_app
+from cv_agent.status_router import router as status_router
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -25,13 +26,20 @@ def create_app() -> FastAPI:
         version="2.0.0"
     )
     
-    # Add CORS middleware
+    # Add CORS middleware - development allows any origin; production matches
+    # origins against a single regex (compiled once by Starlette)
+    if os.getenv("ENVIRONMENT", "development") == "development":
+        cors_origins = {"allow_origins": ["*"], "allow_credentials": True}
+    else:
+        cors_origins = {
+            "allow_origin_regex": os.getenv("CORS_ALLOW_ORIGIN_REGEX", r"^https?://.*$"),
+            "allow_credentials": False,
+        }
     fastapi_app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        **cors_origins,
     )
     
     # Initialize the CV agent (without LLM clients - they'll be configured by user)
@@ -41,7 +49,6 @@ def create_app() -> FastAPI:
         logger.info(f"Agent created successfully: {type(agent)}")
         
         # Set the global agent reference
-        from cv_agent.chat_app import set_global_agent
         set_global_agent(agent)
         
         print("✅ CV Agent initialized successfully (LLM clients will be configured by user)")
@@ -52,44 +59,11 @@ def create_app() -> FastAPI:
     
     # Initialize NiceGUI app
     logger.info("Initializing NiceGUI app...")
-    from cv_agent.chat_app import init_cv_app
     init_cv_app(fastapi_app)
     logger.info("NiceGUI app initialized")
     
-    # Health check endpoint
-    @fastapi_app.get("/health")
-    async def health_check():
-        from cv_agent.chat_app import get_global_agent
-        agent = get_global_agent()
-        return {
-            "status": "healthy",
-            "service": "cv-creator-agent-enhanced",
-            "version": "2.0.0",
-            "agent_initialized": agent is not None,
-            "llm_initialized": is_clients_initialized(),
-            "current_provider": get_current_provider()
-        }
-    
-    # LLM status endpoint
-    @fastapi_app.get("/llm/status")
-    async def llm_status():
-        return {
-            "llm_initialized": is_clients_initialized(),
-            "current_provider": get_current_provider(),
-            "supported_providers": ["openai", "gemini"]
-        }
-    
-    # Agent status endpoint
-    @fastapi_app.get("/agent/status")
-    async def agent_status():
-        from cv_agent.chat_app import get_global_agent
-        agent = get_global_agent()
-        return {
-            "agent_initialized": agent is not None,
-            "agent_type": "LangGraph CV Creator Enhanced" if agent else None,
-            "llm_ready": is_clients_initialized(),
-            "ready_for_processing": agent is not None and is_clients_initialized()
-        }
+    # Status endpoints (/health, /llm/status, /agent/status)
+    fastapi_app.include_router(status_router)
     
     logger.info("FastAPI app creation completed")
     return fastapi_app
@@ -97,7 +71,6 @@ def create_app() -> FastAPI:
 
 def get_agent():
     """Get the global agent instance - for backwards compatibility"""
-    from cv_agent.chat_app import get_global_agent
     return get_global_agent()
 
 
@@ -111,17 +84,17 @@ def main():
     port = int(os.getenv("PORT", 8080))
     environment = os.getenv("ENVIRONMENT", "development")
     
-    print(f"🚀 Starting Enhanced CV Creator Agent on {host}:{port}")
-    print(f"📋 Environment: {environment}")
-    print(f"🤖 Multi-LLM Support: OpenAI GPT-4, Google Gemini")
-    print(f"⚙️ User Configuration Required: API keys will be provided via UI")
-    
-    # Create the app
-    fastapi_app = create_app()
+    logger.info("\n".join([
+        f"🚀 Starting Enhanced CV Creator Agent on {host}:{port}",
+        f"📋 Environment: {environment}",
+        "🤖 Multi-LLM Support: OpenAI GPT-4, Google Gemini",
+        "⚙️ User Configuration Required: API keys will be provided via UI",
+    ]))
     
     # Run the application
     if environment == "development":
         logger.info("Starting in development mode...")
+        fastapi_app = create_app()
         uvicorn.run(
             fastapi_app,
             host=host,
@@ -130,14 +103,22 @@ def main():
             log_level="info"
         )
     else:
-        logger.info("Starting in production mode...")
+        # NiceGUI keeps page/websocket state in-process, so more than one worker
+        # needs sticky routing per worker; default to a single worker
+        workers = int(os.getenv("WORKERS", 1))
+        logger.info(f"Starting in production mode with {workers} worker(s)...")
+        # The factory import string lets each worker build its own app and agent
         uvicorn.run(
-            fastapi_app,
+            "cv_agent.main:create_app",
+            factory=True,
             host=host,
             port=port,
+            loop="uvloop",
+            http="httptools",
+            workers=workers,
             log_level="info"
         )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
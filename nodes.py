@@ -1,798 +1,512 @@
+import asyncio
+import functools
+import hashlib
 import json
-from typing import Dict, Any, List
-from langchain_core.messages import SystemMessage, HumanMessage
-from cv_agent.clients import get_client_analyzer, get_client_generator, is_clients_initialized
-from cv_agent.state import CVCreatorState
+import re
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, ValidationError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from cv_agent.clients import get_client_analyzer, get_client_generator, get_client_status, is_clients_initialized
+from cv_agent.state import (
+    CVCreatorState,
+    BIT_RESUME,
+    BIT_JD,
+    BIT_MATCH,
+    BIT_CV,
+    BIT_FINAL,
+    BIT_FEEDBACK,
+)
 from cv_agent.document_parser import DocumentParser
+from cv_agent.json_utils import robust_json_loads
+from cv_agent.schemas import (
+    ResumeAnalysis,
+    JDAnalysis,
+    MatchAnalysis,
+    SkillsExperienceMatch,
+    KeywordsATSMatch,
+    FullAnalysis,
+    CVGeneration,
+    FeedbackResult,
+    FinalAnalysis,
+)
+from cv_agent.prompts import (
+    RESUME_ANALYSIS_SYSTEM,
+    RESUME_ANALYSIS_PROMPT,
+    JD_ANALYSIS_SYSTEM,
+    JD_ANALYSIS_PROMPT,
+    MATCH_ANALYSIS_INSTRUCTIONS,
+    MATCH_KEYWORDS_INSTRUCTIONS,
+    MATCH_ANALYSIS_PROMPT,
+    FULL_ANALYSIS_SYSTEM,
+    FULL_ANALYSIS_PROMPT,
+    IMPROVED_CV_INSTRUCTIONS,
+    IMPROVED_CV_PROMPT,
+    USER_FEEDBACK_INSTRUCTIONS,
+    USER_FEEDBACK_PROMPT,
+    FINAL_ANALYSIS_INSTRUCTIONS,
+    FINAL_ANALYSIS_PROMPT,
+    JD_CONTEXT_SYSTEM,
+)
 
 
-def analyze_resume_node(state: CVCreatorState) -> Dict[str, Any]:
-    """Extract structured information from resume with enhanced analysis"""
+# System messages are static - built once at import and shared by every call
+_RESUME_ANALYSIS_MSG = SystemMessage(content=RESUME_ANALYSIS_SYSTEM)
+_JD_ANALYSIS_MSG = SystemMessage(content=JD_ANALYSIS_SYSTEM)
+_FULL_ANALYSIS_MSG = SystemMessage(content=FULL_ANALYSIS_SYSTEM)
+
+
+def _analysis_json(state: CVCreatorState, key: str) -> str:
+    """Compact JSON of an analysis dict - serialized once by its producer, rebuilt only if missing"""
+    return getattr(state, f"{key}_json") or json.dumps(getattr(state, key) or {}, separators=(",", ":"))
+
+
+def _jd_messages(state: CVCreatorState, instructions: str, prompt: str) -> List[BaseMessage]:
+    """Messages for a node that takes the job analysis: the shared job-context system
+    message first (identical across those nodes, so its prefix is provider-cacheable),
+    then the node's instructions and prompt"""
+    return [
+        SystemMessage(content=JD_CONTEXT_SYSTEM.format(jd_analysis=_analysis_json(state, "jd_analysis"))),
+        HumanMessage(content=f"{instructions}\n{prompt}")
+    ]
+
+
+def _original_wording(resume_analysis: Dict[str, Any]) -> str:
+    """Verbatim excerpts for the generator: the summary and the first bullet of each role
     
-    if not state.get("uploaded_resume"):
-        return {"error": "No resume uploaded"}
-    
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
-    
-    # Calculate ATS compliance score
-    ats_analysis = DocumentParser.calculate_ats_compliance_score(state["uploaded_resume"])
-    
-    prompt = f"""
-    Analyze the following resume comprehensively and extract structured information in JSON format:
-    
-    Resume Content:
-    {state["uploaded_resume"]}
-    
-    ATS Compliance Analysis:
-    {json.dumps(ats_analysis, indent=2)}
-    
-    Extract ALL available information in this exact JSON structure. Be comprehensive and don't miss details:
-    {{
-        "personal_info": {{
-            "name": "Full name",
-            "email": "email address",
-            "phone": "phone number", 
-            "location": "city, state/country",
-            "linkedin": "LinkedIn profile URL if available",
-            "github": "GitHub profile URL if available",
-            "website": "Personal website if available"
-        }},
-        "professional_summary": "Complete professional summary or objective - capture the full text",
-        "experience": [
-            {{
-                "company": "Company name",
-                "position": "Complete job title",
-                "duration": "Full time period (start - end)",
-                "location": "City, State if mentioned",
-                "responsibilities": [
-                    "Complete bullet point 1 - capture exact text",
-                    "Complete bullet point 2 - capture exact text"
-                ],
-                "achievements": [
-                    "Quantified achievement 1 with numbers",
-                    "Quantified achievement 2 with numbers"
-                ],
-                "technologies": ["List of technologies/tools mentioned for this role"]
-            }}
-        ],
-        "education": [
-            {{
-                "institution": "Full school/university name", 
-                "degree": "Complete degree type and field of study",
-                "graduation_year": "Year or expected year",
-                "location": "City, State if mentioned",
-                "gpa": "GPA if mentioned",
-                "honors": ["Any honors, magna cum laude, etc."],
-                "relevant_coursework": ["Relevant courses if mentioned"]
-            }}
-        ],
-        "skills": {{
-            "technical": ["All technical skills - be comprehensive"],
-            "programming_languages": ["All programming languages"],
-            "frameworks": ["All frameworks and libraries"],
-            "tools": ["All tools and software"],
-            "databases": ["All databases"],
-            "cloud_platforms": ["AWS, Azure, GCP, etc."],
-            "soft_skills": ["All soft skills mentioned"],
-            "languages": ["Spoken languages if mentioned"]
-        }},
-        "certifications": [
-            {{
-                "name": "Full certification name",
-                "issuer": "Issuing organization",
-                "date": "Date obtained",
-                "expiry": "Expiry date if mentioned"
-            }}
-        ],
-        "projects": [
-            {{
-                "name": "Project name",
-                "description": "Complete project description",
-                "technologies": ["Technologies used"],
-                "duration": "Project duration if mentioned",
-                "url": "Project URL if available",
-                "achievements": ["Project achievements with metrics"]
-            }}
-        ],
-        "awards": ["All awards and recognitions"],
-        "publications": ["Any publications mentioned"],
-        "volunteer_experience": [
-            {{
-                "organization": "Organization name",
-                "role": "Volunteer role",
-                "duration": "Time period",
-                "description": "What they did"
-            }}
-        ],
-        "total_experience_years": "Calculate total years of professional experience",
-        "key_industries": ["Industries they have worked in"],
-        "key_keywords": ["ALL important keywords from the resume - be comprehensive"],
-        "resume_format_analysis": {{
-            "has_summary": true/false,
-            "has_quantified_achievements": true/false,
-            "uses_action_verbs": true/false,
-            "contact_info_complete": true/false,
-            "length_appropriate": true/false
-        }}
-    }}
-    
-    IMPORTANT: 
-    - Be extremely thorough and capture ALL information present
-    - Don't summarize or paraphrase - extract complete text
-    - Include all skills, technologies, and keywords mentioned
-    - Capture exact bullet points and achievements
-    - Don't miss any sections or details
-    
-    Only return valid JSON, no additional text.
+    The raw resume is fully covered by the analysis, so only these phrasing anchors are re-sent.
     """
+    lines = []
+    summary = resume_analysis.get("professional_summary")
+    if summary:
+        lines.append(f"Summary: {summary}")
+    for role in resume_analysis.get("experience") or []:
+        bullets = role.get("responsibilities") or role.get("achievements")
+        if bullets:
+            lines.append(f"{role.get('position', '')} @ {role.get('company', '')}: {bullets[0]}")
+    return "\n".join(lines) or "N/A"
+
+
+async def _generate_content(client, messages: List[BaseMessage]) -> str:
+    """Stream a generator response, forwarding each chunk to stream_mode="custom" consumers
     
+    Outside a graph run there is no stream writer, so fall back to a single ainvoke.
+    """
     try:
-        client = get_client_analyzer()
-        response = client.invoke([
-            SystemMessage(content="You are an expert resume parser. Extract ALL information comprehensively. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
-        
-        resume_analysis = json.loads(content)
-        
-        return {
-            "resume_analysis": resume_analysis,
-            "ats_compliance_score": ats_analysis["score"],
-            "ats_feedback": ats_analysis["feedback"],
-            "current_step": "resume_analyzed"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error analyzing resume: {str(e)}"}
+        writer = get_stream_writer()
+    except RuntimeError:
+        return (await client.ainvoke(messages)).content
+    
+    parts = []
+    async for chunk in client.astream(messages):
+        if chunk.content:
+            parts.append(chunk.content)
+            writer(chunk.content)
+    # Parse only once the whole JSON document has arrived
+    return "".join(parts)
 
 
-def analyze_job_description_node(state: CVCreatorState) -> Dict[str, Any]:
-    """Extract comprehensive requirements from job description"""
+# Malformed model output is transient more often than not - retry before failing the node.
+# (Rate limits are already retried by the provider SDKs via max_retries.)
+_PARSE_ERRORS = (json.JSONDecodeError, ValidationError, OutputParserException)
+
+
+def _parse_retrying() -> AsyncRetrying:
+    """Up to 3 attempts with short exponential backoff, on output-parsing errors only"""
+    return AsyncRetrying(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.5, max=4),
+        retry=retry_if_exception_type(_PARSE_ERRORS),
+        reraise=True
+    )
+
+
+def _correction(output: str, error: Exception) -> List[BaseMessage]:
+    """The rejected output followed by what was wrong with it
     
-    if not state.get("job_description"):
-        return {"error": "No job description provided"}
-    
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
-    
-    prompt = f"""
-    Analyze the following job description comprehensively and extract ALL requirements in JSON format:
-    
-    Job Description:
-    {state["job_description"]}
-    
-    Extract the following information in this exact JSON structure. Be extremely thorough:
-    {{
-        "job_title": "Complete position title",
-        "company": "Company name (if mentioned)",
-        "location": "Job location",
-        "employment_type": "Full-time/Part-time/Contract/etc.",
-        "salary_range": "Salary information if mentioned",
-        "required_skills": {{
-            "technical": ["ALL required technical skills"],
-            "programming_languages": ["Required programming languages"],
-            "frameworks": ["Required frameworks and libraries"],
-            "tools": ["Required tools and software"],
-            "databases": ["Required databases"],
-            "cloud_platforms": ["Required cloud platforms"],
-            "soft_skills": ["Required soft skills"],
-            "languages": ["Required spoken languages"]
-        }},
-        "preferred_skills": {{
-            "technical": ["ALL preferred technical skills"],
-            "programming_languages": ["Preferred programming languages"],
-            "frameworks": ["Preferred frameworks and libraries"],
-            "tools": ["Preferred tools and software"],
-            "databases": ["Preferred databases"],
-            "cloud_platforms": ["Preferred cloud platforms"],
-            "soft_skills": ["Preferred soft skills"],
-            "languages": ["Preferred spoken languages"]
-        }},
-        "experience_required": {{
-            "minimum_years": "Minimum years required",
-            "preferred_years": "Preferred years",
-            "specific_experience": [
-                "Specific type of experience 1",
-                "Specific type of experience 2"
-            ],
-            "industry_experience": ["Preferred industries"],
-            "leadership_experience": "Leadership requirements if any"
-        }},
-        "education_requirements": {{
-            "minimum_degree": "Minimum degree required",
-            "preferred_degree": "Preferred degree level",
-            "fields": ["Relevant fields of study"],
-            "alternative_experience": "Can experience substitute for degree?"
-        }},
-        "certifications": [
-            {{
-                "name": "Certification name",
-                "required": true/false,
-                "preferred": true/false
-            }}
-        ],
-        "key_responsibilities": [
-            "Complete responsibility 1",
-            "Complete responsibility 2"
-        ],
-        "success_metrics": ["How success will be measured"],
-        "team_structure": "Team information if mentioned",
-        "reporting_structure": "Who they'll report to",
-        "important_keywords": [
-            "ALL critical keywords that should appear in resume"
-        ],
-        "deal_breakers": [
-            "Absolute requirements that cannot be compromised"
-        ],
-        "nice_to_have": [
-            "Skills/experience that would be a bonus"
-        ],
-        "company_culture": "Company culture and values",
-        "benefits": ["Benefits mentioned if any"],
-        "growth_opportunities": "Career growth information if mentioned"
-    }}
-    
-    IMPORTANT: Be extremely comprehensive and extract ALL requirements, both explicit and implicit.
-    
-    Only return valid JSON, no additional text.
+    A retry must change the prompt: the analyzer answers an identical prompt from its
+    response cache, which would replay the same malformed output. Echoing the output back
+    (as the ATS re-ask does) lets the model fix it instead of re-answering blind.
     """
-    
-    try:
-        client = get_client_analyzer()
-        response = client.invoke([
-            SystemMessage(content="You are an expert job description analyzer. Extract ALL requirements comprehensively. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
-        
-        jd_analysis = json.loads(content)
-        
-        return {
-            "jd_analysis": jd_analysis,
-            "current_step": "jd_analyzed"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error analyzing job description: {str(e)}"}
+    return [
+        AIMessage(content=output),
+        HumanMessage(content=f"That output was invalid: {error}\nReturn ONLY the corrected JSON object.")
+    ]
 
 
-def match_analysis_node(state: CVCreatorState) -> Dict[str, Any]:
-    """Comprehensive match analysis between resume and job description"""
+def _raw_output(message: AIMessage) -> str:
+    """Text of a structured-output response, whether it came back as content or a tool call"""
+    if message.content:
+        return message.content if isinstance(message.content, str) else json.dumps(message.content)
+    for call in (*message.tool_calls, *message.invalid_tool_calls):
+        args = call.get("args")
+        return args if isinstance(args, str) else json.dumps(args)
+    return ""
+
+
+async def _invoke_structured(schema: Type[BaseModel], messages: List[BaseMessage]) -> BaseModel:
+    """Analyzer call bound to a structured-output schema, retried on unparseable output"""
+    # include_raw keeps the rejected response, so a retry can show the model what it sent
+    client = get_client_analyzer().with_structured_output(schema, include_raw=True)
+    correction: List[BaseMessage] = []
+    async for attempt in _parse_retrying():
+        with attempt:
+            response = await client.ainvoke([*messages, *correction])
+            error = response["parsing_error"]
+            if error is None and response["parsed"] is not None:
+                return response["parsed"]
+            error = error or OutputParserException("No structured output returned")
+            correction = _correction(_raw_output(response["raw"]), error)
+            raise error
+
+
+async def _generate_validated(schema: Type[BaseModel], messages: List[BaseMessage]) -> BaseModel:
+    """Streamed generator call validated against schema; retries tell the model what was wrong"""
+    client = get_client_generator()
+    correction: List[BaseMessage] = []
+    async for attempt in _parse_retrying():
+        with attempt:
+            content = await _generate_content(client, [*messages, *correction])
+            try:
+                # Tolerates code fences and stray prose around the JSON object
+                return schema.model_validate(robust_json_loads(content))
+            except _PARSE_ERRORS as e:
+                correction = _correction(content, e)
+                raise
+
+
+_CLIENTS_ERROR = "LLM clients not initialized. Please configure API key first."
+
+Node = Callable[[CVCreatorState], Awaitable[Dict[str, Any]]]
+
+
+def validate_state(*required: str, missing: str, failure: str) -> Callable[[Node], Node]:
+    """Shared guard for the LLM nodes
     
-    if not state.get("resume_analysis") or not state.get("jd_analysis"):
-        return {"error": "Both resume and job description must be analyzed first"}
-    
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
-    
-    prompt = f"""
-    Perform a comprehensive match analysis between the resume and job requirements:
-    
-    RESUME ANALYSIS:
-    {json.dumps(state["resume_analysis"], indent=2)}
-    
-    JOB REQUIREMENTS:
-    {json.dumps(state["jd_analysis"], indent=2)}
-    
-    Provide detailed analysis in this exact JSON structure:
-    {{
-        "overall_match_percentage": 85.5,
-        "detailed_skill_match": {{
-            "technical_skills": {{
-                "matched": ["Skills present in both resume and JD"],
-                "missing": ["Technical skills required but not in resume"],
-                "additional": ["Skills in resume but not required"],
-                "match_percentage": 75.0
-            }},
-            "programming_languages": {{
-                "matched": ["Languages present in both"],
-                "missing": ["Required languages not in resume"],
-                "additional": ["Languages in resume but not required"],
-                "match_percentage": 80.0
-            }},
-            "frameworks_tools": {{
-                "matched": ["Frameworks/tools present in both"],
-                "missing": ["Required frameworks/tools not in resume"],
-                "additional": ["Frameworks/tools in resume but not required"],
-                "match_percentage": 70.0
-            }},
-            "soft_skills": {{
-                "matched": ["Soft skills present in both"],
-                "missing": ["Required soft skills not clearly demonstrated"],
-                "match_percentage": 85.0
-            }}
-        }},
-        "experience_analysis": {{
-            "years_match": true/false,
-            "total_years_candidate": "X years",
-            "total_years_required": "Y years",
-            "years_gap": "Gap in years if any",
-            "industry_match": {{
-                "relevant_industries": ["Industries in common"],
-                "missing_industries": ["Required industries not in resume"],
-                "match_percentage": 90.0
-            }},
-            "role_level_match": {{
-                "current_level": "Junior/Mid/Senior/Lead",
-                "required_level": "Junior/Mid/Senior/Lead", 
-                "match": true/false
-            }},
-            "specific_experience_match": {{
-                "matched": ["Specific experiences that align"],
-                "missing": ["Required experiences not demonstrated"],
-                "match_percentage": 75.0
-            }}
-        }},
-        "education_analysis": {{
-            "degree_match": {{
-                "candidate_degree": "Highest degree",
-                "required_degree": "Required degree",
-                "meets_minimum": true/false,
-                "exceeds_requirement": true/false
-            }},
-            "field_match": {{
-                "candidate_field": "Field of study",
-                "required_fields": ["Required fields"],
-                "relevant": true/false
-            }},
-            "alternative_qualifications": "Can experience substitute for education?"
-        }},
-        "keyword_analysis": {{
-            "total_keywords": 50,
-            "matched_keywords": ["List of matched important keywords"],
-            "missing_critical_keywords": ["Critical keywords not in resume"],
-            "missing_preferred_keywords": ["Preferred keywords not in resume"],
-            "keyword_density_score": 75.0,
-            "ats_keyword_optimization": "Assessment of keyword usage for ATS"
-        }},
-        "certification_analysis": {{
-            "required_certifications": {{
-                "matched": ["Required certs candidate has"],
-                "missing": ["Required certs candidate lacks"]
-            }},
-            "preferred_certifications": {{
-                "matched": ["Preferred certs candidate has"],
-                "missing": ["Preferred certs candidate lacks"]
-            }},
-            "additional_certifications": ["Extra certs that add value"]
-        }},
-        "gaps_identified": [
-            {{
-                "category": "Technical Skills",
-                "gap": "Missing Python programming skills",
-                "severity": "Critical/High/Medium/Low",
-                "addressable": true/false,
-                "suggestions": ["How to address this gap"]
-            }},
-            {{
-                "category": "Experience", 
-                "gap": "Needs 2 more years of ML experience",
-                "severity": "High",
-                "addressable": false,
-                "suggestions": ["How to mitigate this gap"]
-            }}
-        ],
-        "strengths_identified": [
-            {{
-                "category": "Technical Skills",
-                "strength": "Strong Java programming background", 
-                "value": "Directly matches core requirement",
-                "leverage_suggestion": "Highlight Java projects prominently"
-            }}
-        ],
-        "recommendations": [
-            {{
-                "type": "Content Addition",
-                "priority": "High",
-                "description": "Add specific Python projects to demonstrate proficiency",
-                "section": "Projects or Experience"
-            }},
-            {{
-                "type": "Keyword Optimization",
-                "priority": "Medium", 
-                "description": "Include more cloud computing terminology",
-                "section": "Skills or Summary"
-            }},
-            {{
-                "type": "Formatting",
-                "priority": "Low",
-                "description": "Use more action verbs in experience bullets",
-                "section": "Experience"
-            }}
-        ],
-        "match_score_breakdown": {{
-            "skills_weight": 40,
-            "experience_weight": 30,
-            "education_weight": 15,
-            "keywords_weight": 15,
-            "skills_score": 75.0,
-            "experience_score": 80.0,
-            "education_score": 100.0,
-            "keywords_score": 70.0
-        }},
-        "ats_compatibility": {{
-            "current_score": 75,
-            "improvements_needed": ["Specific ATS improvements"],
-            "keyword_optimization": "Assessment of keyword strategy"
-        }},
-        "competitive_analysis": {{
-            "candidate_positioning": "How candidate compares to typical applicants",
-            "standout_factors": ["What makes candidate unique"],
-            "areas_for_improvement": ["Where candidate falls behind"]
-        }}
-    }}
-    
-    IMPORTANT: 
-    - Be extremely thorough in identifying gaps and strengths
-    - Provide specific, actionable recommendations
-    - Calculate match percentages based on actual overlap
-    - Consider both explicit and implicit requirements
-    
-    Only return valid JSON, no additional text.
+    Returns {"error": missing} unless every required state field is populated, the
+    clients error unless the LLM clients are configured, and "failure: <exception>"
+    if the node raises - so the node body only builds its prompt and its update.
     """
     
-    try:
-        client = get_client_analyzer()
-        response = client.invoke([
-            SystemMessage(content="You are an expert at matching resumes to job requirements. Provide comprehensive analysis. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
+    def decorator(node: Node) -> Node:
+        @functools.wraps(node)
+        async def guarded(state: CVCreatorState) -> Dict[str, Any]:
+            if not all(getattr(state, key) for key in required):
+                return {"error": missing}
+            
+            if not is_clients_initialized():
+                return {"error": _CLIENTS_ERROR}
+            
+            try:
+                return await node(state)
+            except Exception as e:
+                return {"error": f"{failure}: {str(e)}"}
         
-        match_analysis = json.loads(content)
-        
-        return {
-            "match_analysis": match_analysis,
-            "match_percentage": match_analysis.get("overall_match_percentage", 0),
-            "identified_gaps": [gap["gap"] for gap in match_analysis.get("gaps_identified", [])],
-            "gap_details": match_analysis.get("gaps_identified", []),
-            "strengths": match_analysis.get("strengths_identified", []),
-            "recommendations": match_analysis.get("recommendations", []),
-            "current_step": "match_analyzed"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error in match analysis: {str(e)}"}
+        return guarded
+    
+    return decorator
 
 
-def generate_improved_cv_node(state: CVCreatorState) -> Dict[str, Any]:
-    """Generate an improved CV with detailed change tracking"""
+@validate_state("uploaded_resume", missing="No resume uploaded", failure="Error analyzing resume")
+async def analyze_resume_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Extract structured information from resume with enhanced analysis"""
     
-    if not all([state.get("resume_analysis"), state.get("jd_analysis"), state.get("match_analysis")]):
-        return {"error": "Complete analysis required before CV generation"}
-    
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
-    
-    prompt = f"""
-    Create an improved, ATS-compliant resume based on the analysis and identified gaps. Track all changes made.
-    
-    ORIGINAL RESUME:
-    {state["uploaded_resume"]}
-    
-    RESUME ANALYSIS:
-    {json.dumps(state["resume_analysis"], indent=2)}
-    
-    JOB REQUIREMENTS:
-    {json.dumps(state["jd_analysis"], indent=2)}
-    
-    MATCH ANALYSIS & GAPS:
-    {json.dumps(state["match_analysis"], indent=2)}
-    
-    Create an improved resume that addresses the gaps while maintaining truthfulness. Return your response as a JSON object with this structure:
-    
-    {{
-        "improved_resume_text": "The complete improved resume in plain text format",
-        "changes_made": [
-            {{
-                "section": "Summary",
-                "change_type": "Added/Modified/Restructured/Enhanced",
-                "original": "Original text or 'N/A' if new",
-                "improved": "New/improved text",
-                "reason": "Why this change was made",
-                "addresses_gap": "Which gap this addresses"
-            }},
-            {{
-                "section": "Skills",
-                "change_type": "Added",
-                "original": "N/A",
-                "improved": "Added Python, Machine Learning",
-                "reason": "Job requires Python and ML skills",
-                "addresses_gap": "Missing technical skills"
-            }}
-        ],
-        "keywords_added": ["List of new keywords incorporated"],
-        "ats_improvements": [
-            "Specific ATS compliance improvements made"
-        ],
-        "sections_restructured": [
-            "Which sections were reorganized and why"
-        ]
-    }}
-    
-    Guidelines for improvement:
-    1. MAINTAIN TRUTHFULNESS - Only enhance/reorganize existing information
-    2. Add missing keywords naturally into existing content
-    3. Quantify achievements where possible
-    4. Use strong action verbs
-    5. Follow ATS-compliant formatting:
-       - Standard section headers
-       - Bullet points for experience
-       - Simple formatting, no tables
-       - Consistent date formatting
-    6. Address identified gaps creatively but truthfully
-    7. Optimize for both ATS and human readers
-    
-    Return ONLY the JSON object, no additional text.
-    """
+    # Calculate ATS compliance score (may call the LLM synchronously, so keep it off the event loop)
+    ats_analysis = await asyncio.to_thread(DocumentParser.cached_ats_compliance_score, state.uploaded_resume)
+    
+    prompt = RESUME_ANALYSIS_PROMPT.format(
+        resume=state.uploaded_resume,
+        ats_analysis=json.dumps(ats_analysis, indent=2)
+    )
+    
+    # Provider-native structured output - no JSON instructions or fence stripping needed
+    result = await _invoke_structured(ResumeAnalysis, [
+        _RESUME_ANALYSIS_MSG,
+        HumanMessage(content=prompt)
+    ])
+    resume_analysis = result.model_dump()
+    
+    return {
+        "resume_analysis": resume_analysis,
+        "resume_analysis_json": result.model_dump_json(),
+        "ats_compliance_score": ats_analysis["score"],
+        "ats_feedback": ats_analysis["feedback"],
+        "completed_steps": BIT_RESUME,
+        "current_step": "resume_analyzed"
+    }
+
+
+@validate_state("job_description", missing="No job description provided", failure="Error analyzing job description")
+async def analyze_job_description_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Extract comprehensive requirements from job description"""
     
-    try:
-        client = get_client_generator()
-        response = client.invoke([
-            SystemMessage(content="You are an expert resume writer. Create improved resumes that track changes and maintain truthfulness. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
-        
-        cv_result = json.loads(content)
-        
-        return {
-            "improved_cv": cv_result.get("improved_resume_text", ""),
-            "changes_made": cv_result.get("changes_made", []),
-            "keywords_added": cv_result.get("keywords_added", []),
-            "ats_improvements": cv_result.get("ats_improvements", []),
-            "sections_restructured": cv_result.get("sections_restructured", []),
-            "current_step": "cv_generated"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error generating improved CV: {str(e)}"}
+    prompt = JD_ANALYSIS_PROMPT.format(
+        job_description=state.job_description
+    )
+    
+    # Provider-native structured output - no JSON instructions or fence stripping needed
+    result = await _invoke_structured(JDAnalysis, [
+        _JD_ANALYSIS_MSG,
+        HumanMessage(content=prompt)
+    ])
+    jd_analysis = result.model_dump()
+    
+    return {
+        "jd_analysis": jd_analysis,
+        "jd_analysis_json": result.model_dump_json(),
+        "completed_steps": BIT_JD,
+        "current_step": "jd_analyzed"
+    }
 
 
-def apply_user_feedback_node(state: CVCreatorState) -> Dict[str, Any]:
-    """Apply user feedback to the generated CV with change tracking"""
+async def analyze_both_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Analyze resume and job description concurrently and merge the results"""
+    
+    # The two analyses are independent, so the stage costs max(T_resume, T_jd) instead of the sum
+    resume_result, jd_result = await asyncio.gather(
+        analyze_resume_node(state),
+        analyze_job_description_node(state)
+    )
+    
+    for result in (resume_result, jd_result):
+        if "error" in result:
+            return result
+    
+    return {
+        **resume_result,
+        **jd_result,
+        "completed_steps": resume_result["completed_steps"] | jd_result["completed_steps"]
+    }
+
+
+@validate_state(
+    "uploaded_resume", "job_description",
+    missing="Resume and job description are both required",
+    failure="Error analyzing resume and job description"
+)
+async def analyze_all_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Analyze resume and job description and match them in a single LLM call"""
+    
+    # Calculate ATS compliance score (may call the LLM synchronously, so keep it off the event loop)
+    ats_analysis = await asyncio.to_thread(DocumentParser.cached_ats_compliance_score, state.uploaded_resume)
+    
+    prompt = FULL_ANALYSIS_PROMPT.format(
+        resume=state.uploaded_resume,
+        ats_analysis=json.dumps(ats_analysis, indent=2),
+        job_description=state.job_description
+    )
+    
+    # One round-trip instead of resume -> JD -> match, each re-sending the same raw text
+    result = await _invoke_structured(FullAnalysis, [
+        _FULL_ANALYSIS_MSG,
+        HumanMessage(content=prompt)
+    ])
+    
+    return {
+        "resume_analysis": result.resume_analysis.model_dump(),
+        "resume_analysis_json": result.resume_analysis.model_dump_json(),
+        "ats_compliance_score": ats_analysis["score"],
+        "ats_feedback": ats_analysis["feedback"],
+        "jd_analysis": result.jd_analysis.model_dump(),
+        "jd_analysis_json": result.jd_analysis.model_dump_json(),
+        **_match_update(result.match_analysis),
+        "completed_steps": BIT_RESUME | BIT_JD | BIT_MATCH
+    }
+
+
+# Gap, AddressedGap and RemainingGap all carry the description in .gap
+_get_gap = attrgetter("gap")
+
+
+def _match_update(result: MatchAnalysis) -> Dict[str, Any]:
+    """State update for an accepted match analysis
+    
+    The validated model guarantees every key and item type, so the fields are read
+    directly - one pass over the gaps, no .get() fallbacks or KeyError paths.
+    """
+    match_analysis = result.model_dump()
+    return {
+        "match_analysis": match_analysis,
+        "match_analysis_json": result.model_dump_json(),
+        "match_percentage": result.overall_match_percentage,
+        "identified_gaps": list(map(_get_gap, result.gaps_identified)),
+        "gap_details": match_analysis["gaps_identified"],
+        "strengths": match_analysis["strengths_identified"],
+        "recommendations": match_analysis["recommendations"],
+        "completed_steps": BIT_MATCH,
+        "current_step": "match_analyzed"
+    }
+
+
+@validate_state(
+    "resume_analysis", "jd_analysis",
+    missing="Both resume and job description must be analyzed first",
+    failure="Error in match analysis"
+)
+async def match_analysis_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Comprehensive match analysis between resume and job description"""
+    
+    prompt = MATCH_ANALYSIS_PROMPT.format(
+        resume_analysis=_analysis_json(state, "resume_analysis")
+    )
     
-    if not state.get("improved_cv"):
-        return {"error": "No improved CV to modify"}
+    # Two half-size schemas decoded concurrently - latency follows output length
+    skills_experience, keywords_ats = await asyncio.gather(
+        _invoke_structured(SkillsExperienceMatch, _jd_messages(state, MATCH_ANALYSIS_INSTRUCTIONS, prompt)),
+        _invoke_structured(KeywordsATSMatch, _jd_messages(state, MATCH_KEYWORDS_INSTRUCTIONS, prompt))
+    )
     
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
+    return _match_update(MatchAnalysis(**dict(skills_experience), **dict(keywords_ats)))
+
+
+@validate_state(
+    "resume_analysis", "jd_analysis", "match_analysis",
+    missing="Complete analysis required before CV generation",
+    failure="Error generating improved CV"
+)
+async def generate_improved_cv_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Generate an improved CV with detailed change tracking"""
+    
+    prompt = IMPROVED_CV_PROMPT.format(
+        original_wording=_original_wording(state.resume_analysis),
+        resume_analysis=_analysis_json(state, "resume_analysis"),
+        match_analysis=_analysis_json(state, "match_analysis")
+    )
+    
+    cv_result = await _generate_validated(CVGeneration, _jd_messages(state, IMPROVED_CV_INSTRUCTIONS, prompt))
+    
+    return {
+        "improved_cv": cv_result.improved_resume_text,
+        "changes_made": [change.model_dump() for change in cv_result.changes_made],
+        "keywords_added": cv_result.keywords_added,
+        "ats_improvements": cv_result.ats_improvements,
+        "sections_restructured": cv_result.sections_restructured,
+        "completed_steps": BIT_CV,
+        "current_step": "cv_generated"
+    }
+
+
+# Feedback that only approves the CV - the whole reply, so "ok, but ..." still goes to the LLM
+_TRIVIAL_FEEDBACK_RE = re.compile(
+    r"(?:ok(?:ay)?|looks (?:good|great|fine)|lgtm|approved?|ship it|no (?:more )?changes?( needed)?|perfect|great)[\s.!]*",
+    re.IGNORECASE
+)
+
+
+@validate_state("improved_cv", missing="No improved CV to modify", failure="Error applying user feedback")
+async def apply_user_feedback_node(state: CVCreatorState) -> Dict[str, Any]:
+    """Apply user feedback to the generated CV with change tracking"""
     
     # Store user feedback in state
-    user_feedback = state.get("user_feedback", "")
+    user_feedback = (state.user_feedback or "").strip()
     
-    if not user_feedback:
-        # No feedback provided, use improved CV as final
+    if not user_feedback or _TRIVIAL_FEEDBACK_RE.fullmatch(user_feedback):
+        # No feedback or a plain approval - use improved CV as final without an LLM round-trip
         return {
-            "final_cv": state["improved_cv"],
+            "final_cv": state.improved_cv,
             "user_feedback_applied": [],
+            "user_feedback_text": user_feedback or None,
+            "trivial_feedback": bool(user_feedback),
+            "completed_steps": BIT_FEEDBACK,
             "current_step": "cv_finalized"
         }
     
-    prompt = f"""
-    Apply the user's feedback to improve the CV further. Track what changes are made based on feedback.
-    
-    CURRENT CV:
-    {state["improved_cv"]}
-    
-    USER FEEDBACK:
-    {user_feedback}
-    
-    JOB REQUIREMENTS (for context):
-    {json.dumps(state.get("jd_analysis", {}), indent=2)}
-    
-    ORIGINAL CHANGES MADE:
-    {json.dumps(state.get("changes_made", []), indent=2)}
-    
-    Apply the user's feedback and return a JSON response:
-    
-    {{
-        "final_resume_text": "The updated resume incorporating user feedback",
-        "feedback_changes": [
-            {{
-                "feedback_item": "The specific feedback being addressed",
-                "section": "Which section was modified",
-                "change_type": "Added/Modified/Removed/Restructured",
-                "original": "What was there before",
-                "updated": "What it became",
-                "reasoning": "Why this change addresses the feedback"
-            }}
-        ],
-        "feedback_not_applied": [
-            {{
-                "feedback_item": "Feedback that couldn't be applied",
-                "reason": "Why it wasn't applied (e.g., would hurt ATS score, not truthful, etc.)"
-            }}
-        ]
-    }}
-    
-    Guidelines:
-    1. Address user feedback while maintaining ATS compliance
-    2. Keep all information truthful
-    3. Explain why some feedback might not be applied
-    4. Maintain professional formatting
-    5. Ensure changes align with job requirements
-    
-    Return ONLY the JSON object.
-    """
-    
-    try:
-        client = get_client_generator()
-        response = client.invoke([
-            SystemMessage(content="You are an expert resume editor. Apply user feedback thoughtfully while maintaining quality. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
-        
-        feedback_result = json.loads(content)
-        
-        return {
-            "final_cv": feedback_result.get("final_resume_text", state["improved_cv"]),
-            "user_feedback_applied": feedback_result.get("feedback_changes", []),
-            "feedback_not_applied": feedback_result.get("feedback_not_applied", []),
-            "user_feedback_text": user_feedback,  # Store the original feedback
-            "current_step": "cv_finalized"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error applying user feedback: {str(e)}"}
+    prompt = USER_FEEDBACK_PROMPT.format(
+        improved_cv=state.improved_cv,
+        user_feedback=user_feedback,
+        changes_made=json.dumps(state.changes_made or [], indent=2)
+    )
+    
+    feedback_result = await _generate_validated(
+        FeedbackResult, _jd_messages(state, USER_FEEDBACK_INSTRUCTIONS, prompt)
+    )
+    
+    return {
+        "final_cv": feedback_result.final_resume_text or state.improved_cv,
+        "user_feedback_applied": [change.model_dump() for change in feedback_result.feedback_changes],
+        "feedback_not_applied": [item.model_dump() for item in feedback_result.feedback_not_applied],
+        "user_feedback_text": user_feedback,  # Store the original feedback
+        "trivial_feedback": False,  # Reset an earlier approval on a checkpointed thread
+        "completed_steps": BIT_FEEDBACK,
+        "current_step": "cv_finalized"
+    }
 
 
-def final_analysis_node(state: CVCreatorState) -> Dict[str, Any]:
+# Final analyses keyed by (blake2b digest of the prompt messages, LLM client status); bounded
+# in-memory LRU like the ATS cache. On by default, unlike the opt-in SQLite cache: nothing is
+# written to disk, entries go with the process, and a hit needs byte-identical inputs
+_FINAL_ANALYSIS_CACHE: "OrderedDict[Tuple[str, Tuple[bool, Optional[str]]], FinalAnalysis]" = OrderedDict()
+_FINAL_ANALYSIS_CACHE_LOCK = threading.Lock()
+_FINAL_ANALYSIS_CACHE_SIZE = 64
+
+
+async def _cached_final_analysis(messages: List[BaseMessage]) -> FinalAnalysis:
+    """Final-analysis call memoized on a digest of its prompt; failed calls are not cached"""
+    digest = hashlib.blake2b(digest_size=16)
+    for message in messages:
+        digest.update(message.content.encode())
+        digest.update(b"\0")
+    key = (digest.hexdigest(), get_client_status())
+    
+    with _FINAL_ANALYSIS_CACHE_LOCK:
+        result = _FINAL_ANALYSIS_CACHE.get(key)
+        if result is not None:
+            _FINAL_ANALYSIS_CACHE.move_to_end(key)
+    
+    if result is None:
+        result = await _invoke_structured(FinalAnalysis, messages)
+        with _FINAL_ANALYSIS_CACHE_LOCK:
+            _FINAL_ANALYSIS_CACHE[key] = result
+            _FINAL_ANALYSIS_CACHE.move_to_end(key)
+            if len(_FINAL_ANALYSIS_CACHE) > _FINAL_ANALYSIS_CACHE_SIZE:
+                _FINAL_ANALYSIS_CACHE.popitem(last=False)
+    
+    # The node overwrites the measured ATS fields, so callers get their own copy
+    return result.model_copy(deep=True)
+
+
+@validate_state(
+    "final_cv", "jd_analysis",
+    missing="Final CV and job analysis required",
+    failure="Error in final analysis"
+)
+async def final_analysis_node(state: CVCreatorState) -> Dict[str, Any]:
     """Perform comprehensive final analysis of the improved CV"""
     
-    if not state.get("final_cv") or not state.get("jd_analysis"):
-        return {"error": "Final CV and job analysis required"}
-    
-    if not is_clients_initialized():
-        return {"error": "LLM clients not initialized. Please configure API key first."}
-    
-    # Calculate new ATS compliance score
-    final_ats_analysis = DocumentParser.calculate_ats_compliance_score(state["final_cv"])
-    
-    prompt = f"""
-    Analyze the final CV against job requirements and provide comprehensive improvement analysis:
-    
-    FINAL CV:
-    {state["final_cv"]}
-    
-    ORIGINAL CV:
-    {state["uploaded_resume"]}
-    
-    JOB REQUIREMENTS:
-    {json.dumps(state["jd_analysis"], indent=2)}
-    
-    ORIGINAL MATCH ANALYSIS:
-    {json.dumps(state.get("match_analysis", {}), indent=2)}
-    
-    CHANGES MADE:
-    {json.dumps(state.get("changes_made", []), indent=2)}
-    
-    USER FEEDBACK APPLIED:
-    {json.dumps(state.get("user_feedback_applied", []), indent=2)}
-    
-    NEW ATS ANALYSIS:
-    {json.dumps(final_ats_analysis, indent=2)}
-    
-    Provide comprehensive final analysis in this JSON structure:
-    {{
-        "final_match_analysis": {{
-            "overall_match_percentage": 92.5,
-            "improvement_from_original": 15.5,
-            "skill_match_percentage": 85.0,
-            "experience_match_percentage": 90.0,
-            "keyword_match_percentage": 95.0,
-            "education_match_percentage": 100.0
-        }},
-        "ats_compliance": {{
-            "final_score": 88,
-            "improvement_from_original": 13,
-            "strong_areas": ["Areas where ATS compliance is strong"],
-            "areas_for_improvement": ["Remaining ATS issues if any"],
-            "keyword_optimization_score": 85
-        }},
-        "gaps_analysis": {{
-            "original_gaps": ["List of original gaps"],
-            "gaps_addressed": [
-                {{
-                    "gap": "Gap that was addressed",
-                    "how_addressed": "How it was addressed in the CV",
-                    "effectiveness": "High/Medium/Low"
-                }}
-            ],
-            "remaining_gaps": [
-                {{
-                    "gap": "Gap that still exists", 
-                    "reason": "Why it couldn't be addressed",
-                    "mitigation": "How it's mitigated in the CV"
-                }}
-            ]
-        }},
-        "improvement_summary": {{
-            "key_enhancements": [
-                "Major improvement 1",
-                "Major improvement 2" 
-            ],
-            "sections_improved": ["Which sections were enhanced"],
-            "new_strengths": ["New strengths highlighted"],
-            "competitive_advantage": "How this CV now stands out"
-        }},
-        "recommendations": {{
-            "for_application": [
-                "How to use this CV effectively",
-                "Cover letter focus areas"
-            ],
-            "for_interview": [
-                "Key points to prepare for interview",
-                "Stories to develop"
-            ],
-            "for_further_improvement": [
-                "Long-term career development suggestions"
-            ]
-        }}
-    }}
-    
-    Only return valid JSON, no additional text.
-    """
-    
-    try:
-        client = get_client_analyzer()
-        response = client.invoke([
-            SystemMessage(content="You are an expert at analyzing CV improvements. Provide comprehensive final analysis. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Clean the response and parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content[7:-3]
-        elif content.startswith("```"):
-            content = content[3:-3]
-        
-        final_analysis = json.loads(content)
-        
-        return {
-            "final_match_percentage": final_analysis.get("final_match_analysis", {}).get("overall_match_percentage", 0),
-            "final_ats_score": final_ats_analysis["score"],
-            "ats_improvement": final_ats_analysis["score"] - state.get("ats_compliance_score", 0),
-            "addressed_gaps": [gap["gap"] for gap in final_analysis.get("gaps_analysis", {}).get("gaps_addressed", [])],
-            "remaining_gaps": [gap["gap"] for gap in final_analysis.get("gaps_analysis", {}).get("remaining_gaps", [])],
-            "improvement_summary": final_analysis.get("improvement_summary", {}),
-            "final_analysis": final_analysis,
-            "current_step": "analysis_complete"
-        }
-        
-    except Exception as e:
-        return {"error": f"Error in final analysis: {str(e)}"}
\ No newline at end of file
+    prompt = FINAL_ANALYSIS_PROMPT.format(
+        final_cv=state.final_cv,
+        match_analysis=_analysis_json(state, "match_analysis"),
+        changes_made=json.dumps(state.changes_made or [], indent=2),
+        feedback_applied=json.dumps(state.user_feedback_applied or [], indent=2),
+        original_ats_score=state.ats_compliance_score if state.ats_compliance_score is not None else "N/A"
+    )
+    
+    # The new ATS score (possibly its own LLM call) and the final analysis are independent,
+    # so the stage costs max(T_ats, T_analysis) instead of the sum
+    final_ats_analysis, result = await asyncio.gather(
+        asyncio.to_thread(DocumentParser.cached_ats_compliance_score, state.final_cv),
+        _cached_final_analysis(_jd_messages(state, FINAL_ANALYSIS_INSTRUCTIONS, prompt))
+    )
+    # The measured score is authoritative over the model's estimate; the other ats_compliance
+    # fields stay model estimates (the prompt and schema say so)
+    result.ats_compliance.final_score = final_ats_analysis["score"]
+    result.ats_compliance.improvement_from_original = final_ats_analysis["score"] - (state.ats_compliance_score or 0)
+    final_analysis = result.model_dump()
+    gaps_analysis = result.gaps_analysis
+    
+    return {
+        "final_match_percentage": result.final_match_analysis.overall_match_percentage,
+        "final_ats_score": result.ats_compliance.final_score,
+        "ats_improvement": result.ats_compliance.improvement_from_original,
+        "addressed_gaps": list(map(_get_gap, gaps_analysis.gaps_addressed)),
+        "remaining_gaps": list(map(_get_gap, gaps_analysis.remaining_gaps)),
+        "improvement_summary": final_analysis["improvement_summary"],
+        "final_analysis": final_analysis,
+        "completed_steps": BIT_FINAL,
+        "current_step": "analysis_complete"
+    }
\ No newline at end of file
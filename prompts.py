@@ -0,0 +1,210 @@
+"""Prompt templates for the CV Creator nodes
+
+Kept at module level and filled with str.format so identical inputs produce
+byte-identical prompts (and hit the LLM response cache).
+
+Nodes that use structured output get their JSON schema from the provider
+binding (see schemas.py), so their prompts carry no inline schema; the two
+streaming generator prompts embed a minified output shape serialized once at
+import time. The analysis nodes keep their standing instructions in the system
+message. The nodes that take the job analysis (match, generation, feedback,
+final) all open with the same JD_CONTEXT_SYSTEM message instead and carry their
+*_INSTRUCTIONS at the top of the user message.
+"""
+
+import json
+
+
+# First message of every node that takes the job analysis. It is byte-identical for
+# all of them within a session, so provider prefix caching (automatic on OpenAI) can
+# reuse it across the match, generation, feedback and final calls; everything
+# node-specific comes after it.
+JD_CONTEXT_SYSTEM = """You are an expert resume writer and job-matching analyst. Every task in this session
+refers to the job requirements below.
+
+### JD_SCHEMA_V1
+{jd_analysis}"""
+
+
+def _minified(shape) -> str:
+    """Compact JSON for embedding in a str.format template (braces escaped)"""
+    return json.dumps(shape, separators=(",", ":")).replace("{", "{{").replace("}", "}}")
+
+
+# Resume analysis (analyze_resume_node)
+RESUME_ANALYSIS_SYSTEM = """You are an expert resume parser. Extract ALL information comprehensively.
+- Be extremely thorough and capture ALL information present
+- Don't summarize or paraphrase - extract complete text
+- Include all skills, technologies, and keywords mentioned
+- Capture exact bullet points and achievements
+- Don't miss any sections or details"""
+
+RESUME_ANALYSIS_PROMPT = """
+    Analyze the following resume comprehensively and extract ALL available information:
+
+    Resume Content:
+    {resume}
+
+    ATS Compliance Analysis:
+    {ats_analysis}
+    """
+
+# Job description analysis (analyze_job_description_node)
+JD_ANALYSIS_SYSTEM = """You are an expert job description analyzer. Extract ALL requirements comprehensively.
+- Be extremely comprehensive and extract ALL requirements, both explicit and implicit"""
+
+JD_ANALYSIS_PROMPT = """
+    Analyze the following job description comprehensively and extract ALL requirements:
+
+    Job Description:
+    {job_description}
+    """
+
+# Resume vs. job description match (match_analysis_node)
+MATCH_ANALYSIS_INSTRUCTIONS = """You are an expert at matching resumes to job requirements. Provide comprehensive analysis.
+- Be extremely thorough in identifying gaps and strengths
+- Provide specific, actionable recommendations
+- Calculate match percentages based on actual overlap
+- Consider both explicit and implicit requirements
+This part covers skills, experience and education; keywords and ATS are analyzed separately."""
+
+MATCH_KEYWORDS_INSTRUCTIONS = """You are an expert at ATS keyword matching. Compare the resume's keywords, certifications
+and ATS readiness against the job requirements, and assess how the candidate is positioned against other applicants."""
+
+MATCH_ANALYSIS_PROMPT = """
+    Perform a comprehensive match analysis between the resume and the job requirements above:
+
+    RESUME ANALYSIS:
+    {resume_analysis}
+    """
+
+# Fused resume + job description + match analysis (analyze_all_node)
+FULL_ANALYSIS_SYSTEM = "You are an expert resume parser, job description analyzer and resume-to-job matcher. Be comprehensive."
+
+FULL_ANALYSIS_PROMPT = """
+    ### RESUME
+    {resume}
+
+    ### ATS_ANALYSIS
+    {ats_analysis}
+
+    ### JOB_DESCRIPTION
+    {job_description}
+
+    ### TASKS
+    1. resume_analysis: extract ALL information from the resume - exact bullet points,
+       achievements, every skill, technology and keyword. Don't summarize or paraphrase.
+    2. jd_analysis: extract ALL requirements from the job description, both explicit and implicit.
+    3. match_analysis: compare the two. Calculate match percentages from the actual overlap,
+       identify every gap (with severity) and strength, and give specific, actionable recommendations.
+
+    Return all three results together.
+    """
+
+# Improved CV generation (generate_improved_cv_node)
+CV_GENERATION_SHAPE = {
+    "improved_resume_text": "complete improved resume, plain text",
+    "changes_made": [{
+        "section": "str",
+        "change_type": "Added|Modified|Restructured|Enhanced",
+        "original": "original text or N/A if new",
+        "improved": "str",
+        "reason": "why the change was made",
+        "addresses_gap": "gap it addresses"
+    }],
+    "keywords_added": ["str"],
+    "ats_improvements": ["str"],
+    "sections_restructured": ["section and why"]
+}
+
+IMPROVED_CV_INSTRUCTIONS = """You are an expert resume writer. Create improved resumes that track changes and maintain truthfulness. Return only valid JSON.
+Guidelines for improvement:
+1. MAINTAIN TRUTHFULNESS - Only enhance/reorganize existing information
+2. Add missing keywords naturally into existing content
+3. Quantify achievements where possible
+4. Use strong action verbs
+5. Follow ATS-compliant formatting: standard section headers, bullet points for experience,
+   simple formatting (no tables), consistent date formatting
+6. Address identified gaps creatively but truthfully
+7. Optimize for both ATS and human readers"""
+
+IMPROVED_CV_PROMPT = f"""
+    Create an improved, ATS-compliant resume for the job requirements above, based on the analysis
+    and identified gaps. Track all changes made.
+
+    RESUME ANALYSIS:
+    {{resume_analysis}}
+
+    ORIGINAL WORDING (verbatim excerpts):
+    {{original_wording}}
+
+    MATCH ANALYSIS & GAPS:
+    {{match_analysis}}
+
+    Return ONLY a JSON object of this shape:
+    {_minified(CV_GENERATION_SHAPE)}
+    """
+
+# User feedback application (apply_user_feedback_node)
+FEEDBACK_SHAPE = {
+    "final_resume_text": "updated resume incorporating the feedback",
+    "feedback_changes": [{
+        "feedback_item": "str",
+        "section": "str",
+        "change_type": "Added|Modified|Removed|Restructured",
+        "original": "str",
+        "updated": "str",
+        "reasoning": "why this addresses the feedback"
+    }],
+    "feedback_not_applied": [{"feedback_item": "str", "reason": "why it wasn't applied"}]
+}
+
+USER_FEEDBACK_INSTRUCTIONS = """You are an expert resume editor. Apply user feedback thoughtfully while maintaining quality. Return only valid JSON.
+Guidelines:
+1. Address user feedback while maintaining ATS compliance
+2. Keep all information truthful
+3. Explain why some feedback might not be applied (e.g., would hurt ATS score, not truthful)
+4. Maintain professional formatting
+5. Ensure changes align with job requirements"""
+
+USER_FEEDBACK_PROMPT = f"""
+    Apply the user's feedback to improve the CV further, keeping the job requirements above in mind.
+    Track what changes are made based on feedback.
+
+    CURRENT CV:
+    {{improved_cv}}
+
+    USER FEEDBACK:
+    {{user_feedback}}
+
+    ORIGINAL CHANGES MADE:
+    {{changes_made}}
+
+    Return ONLY a JSON object of this shape:
+    {_minified(FEEDBACK_SHAPE)}
+    """
+
+# Final analysis (final_analysis_node)
+FINAL_ANALYSIS_INSTRUCTIONS = "You are an expert at analyzing CV improvements. Provide comprehensive final analysis."
+
+FINAL_ANALYSIS_PROMPT = """
+    Analyze the final CV against the job requirements above and provide comprehensive improvement analysis:
+
+    FINAL CV:
+    {final_cv}
+
+    ORIGINAL MATCH ANALYSIS:
+    {match_analysis}
+
+    CHANGES MADE:
+    {changes_made}
+
+    USER FEEDBACK APPLIED:
+    {feedback_applied}
+
+    ORIGINAL ATS SCORE:
+    {original_ats_score}
+
+    The final CV's ATS score is measured separately: leave ats_compliance.final_score and
+    improvement_from_original at 0, and treat the other ats_compliance fields as your estimate.
+    """
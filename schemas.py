@@ -0,0 +1,427 @@
+"""Structured-output schemas for the CV Creator nodes
+
+Each model mirrors the JSON structure the corresponding prompt used to spell out
+inline. Nodes bind them with client.with_structured_output(...) and store
+model_dump() in the state, so downstream code keeps working on plain dicts.
+Descriptive fields default to empty so a sparse answer still validates; the
+load-bearing ones (scores, gap lists, the CV text) are required, so omitting them
+raises ValidationError and the call is retried instead of routing on a silent 0/"".
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# Resume analysis (analyze_resume_node)
+
+class PersonalInfo(BaseModel):
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = Field("", description="City, state/country")
+    linkedin: str = ""
+    github: str = ""
+    website: str = ""
+
+
+class Experience(BaseModel):
+    company: str = ""
+    position: str = Field("", description="Complete job title")
+    duration: str = Field("", description="Full time period (start - end)")
+    location: str = ""
+    responsibilities: List[str] = Field(default_factory=list, description="Exact bullet point text")
+    achievements: List[str] = Field(default_factory=list, description="Quantified achievements with numbers")
+    technologies: List[str] = Field(default_factory=list)
+
+
+class Education(BaseModel):
+    institution: str = ""
+    degree: str = Field("", description="Degree type and field of study")
+    graduation_year: str = ""
+    location: str = ""
+    gpa: str = ""
+    honors: List[str] = Field(default_factory=list)
+    relevant_coursework: List[str] = Field(default_factory=list)
+
+
+class SkillSet(BaseModel):
+    technical: List[str] = Field(default_factory=list)
+    programming_languages: List[str] = Field(default_factory=list)
+    frameworks: List[str] = Field(default_factory=list)
+    tools: List[str] = Field(default_factory=list)
+    databases: List[str] = Field(default_factory=list)
+    cloud_platforms: List[str] = Field(default_factory=list)
+    soft_skills: List[str] = Field(default_factory=list)
+    languages: List[str] = Field(default_factory=list, description="Spoken languages")
+
+
+class Certification(BaseModel):
+    name: str = ""
+    issuer: str = ""
+    date: str = ""
+    expiry: str = ""
+
+
+class Project(BaseModel):
+    name: str = ""
+    description: str = ""
+    technologies: List[str] = Field(default_factory=list)
+    duration: str = ""
+    url: str = ""
+    achievements: List[str] = Field(default_factory=list)
+
+
+class VolunteerExperience(BaseModel):
+    organization: str = ""
+    role: str = ""
+    duration: str = ""
+    description: str = ""
+
+
+class ResumeFormatAnalysis(BaseModel):
+    has_summary: bool = False
+    has_quantified_achievements: bool = False
+    uses_action_verbs: bool = False
+    contact_info_complete: bool = False
+    length_appropriate: bool = False
+
+
+class ResumeAnalysis(BaseModel):
+    """Everything in the resume, extracted verbatim and comprehensively"""
+    personal_info: PersonalInfo = Field(default_factory=PersonalInfo)
+    professional_summary: str = Field("", description="Full summary or objective text")
+    experience: List[Experience] = Field(default_factory=list)
+    education: List[Education] = Field(default_factory=list)
+    skills: SkillSet = Field(default_factory=SkillSet)
+    certifications: List[Certification] = Field(default_factory=list)
+    projects: List[Project] = Field(default_factory=list)
+    awards: List[str] = Field(default_factory=list)
+    publications: List[str] = Field(default_factory=list)
+    volunteer_experience: List[VolunteerExperience] = Field(default_factory=list)
+    total_experience_years: str = Field("", description="Total years of professional experience")
+    key_industries: List[str] = Field(default_factory=list)
+    key_keywords: List[str] = Field(default_factory=list, description="ALL important keywords in the resume")
+    resume_format_analysis: ResumeFormatAnalysis = Field(default_factory=ResumeFormatAnalysis)
+
+
+# Job description analysis (analyze_job_description_node)
+
+class ExperienceRequirements(BaseModel):
+    minimum_years: str = ""
+    preferred_years: str = ""
+    specific_experience: List[str] = Field(default_factory=list)
+    industry_experience: List[str] = Field(default_factory=list)
+    leadership_experience: str = ""
+
+
+class EducationRequirements(BaseModel):
+    minimum_degree: str = ""
+    preferred_degree: str = ""
+    fields: List[str] = Field(default_factory=list)
+    alternative_experience: str = Field("", description="Can experience substitute for the degree?")
+
+
+class RequiredCertification(BaseModel):
+    name: str = ""
+    required: bool = False
+    preferred: bool = False
+
+
+class JDAnalysis(BaseModel):
+    """Every explicit and implicit requirement in the job description"""
+    job_title: str = ""
+    company: str = ""
+    location: str = ""
+    employment_type: str = Field("", description="Full-time/Part-time/Contract/etc.")
+    salary_range: str = ""
+    required_skills: SkillSet = Field(default_factory=SkillSet)
+    preferred_skills: SkillSet = Field(default_factory=SkillSet)
+    experience_required: ExperienceRequirements = Field(default_factory=ExperienceRequirements)
+    education_requirements: EducationRequirements = Field(default_factory=EducationRequirements)
+    certifications: List[RequiredCertification] = Field(default_factory=list)
+    key_responsibilities: List[str] = Field(default_factory=list)
+    success_metrics: List[str] = Field(default_factory=list)
+    team_structure: str = ""
+    reporting_structure: str = ""
+    important_keywords: List[str] = Field(default_factory=list, description="ALL keywords that should appear in the resume")
+    deal_breakers: List[str] = Field(default_factory=list)
+    nice_to_have: List[str] = Field(default_factory=list)
+    company_culture: str = ""
+    benefits: List[str] = Field(default_factory=list)
+    growth_opportunities: str = ""
+
+
+# Match analysis (match_analysis_node)
+
+class SkillMatch(BaseModel):
+    matched: List[str] = Field(default_factory=list, description="Present in both resume and JD")
+    missing: List[str] = Field(default_factory=list, description="Required but not in the resume")
+    additional: List[str] = Field(default_factory=list, description="In the resume but not required")
+    match_percentage: float = 0.0
+
+
+class DetailedSkillMatch(BaseModel):
+    technical_skills: SkillMatch = Field(default_factory=SkillMatch)
+    programming_languages: SkillMatch = Field(default_factory=SkillMatch)
+    frameworks_tools: SkillMatch = Field(default_factory=SkillMatch)
+    soft_skills: SkillMatch = Field(default_factory=SkillMatch)
+
+
+class IndustryMatch(BaseModel):
+    relevant_industries: List[str] = Field(default_factory=list)
+    missing_industries: List[str] = Field(default_factory=list)
+    match_percentage: float = 0.0
+
+
+class RoleLevelMatch(BaseModel):
+    current_level: str = Field("", description="Junior/Mid/Senior/Lead")
+    required_level: str = Field("", description="Junior/Mid/Senior/Lead")
+    match: bool = False
+
+
+class ExperienceAnalysis(BaseModel):
+    years_match: bool = False
+    total_years_candidate: str = ""
+    total_years_required: str = ""
+    years_gap: str = ""
+    industry_match: IndustryMatch = Field(default_factory=IndustryMatch)
+    role_level_match: RoleLevelMatch = Field(default_factory=RoleLevelMatch)
+    specific_experience_match: SkillMatch = Field(default_factory=SkillMatch)
+
+
+class DegreeMatch(BaseModel):
+    candidate_degree: str = ""
+    required_degree: str = ""
+    meets_minimum: bool = False
+    exceeds_requirement: bool = False
+
+
+class FieldMatch(BaseModel):
+    candidate_field: str = ""
+    required_fields: List[str] = Field(default_factory=list)
+    relevant: bool = False
+
+
+class EducationAnalysis(BaseModel):
+    degree_match: DegreeMatch = Field(default_factory=DegreeMatch)
+    field_match: FieldMatch = Field(default_factory=FieldMatch)
+    alternative_qualifications: str = ""
+
+
+class KeywordAnalysis(BaseModel):
+    total_keywords: int = 0
+    matched_keywords: List[str] = Field(default_factory=list)
+    missing_critical_keywords: List[str] = Field(default_factory=list)
+    missing_preferred_keywords: List[str] = Field(default_factory=list)
+    keyword_density_score: float = 0.0
+    ats_keyword_optimization: str = ""
+
+
+class CertificationMatch(BaseModel):
+    matched: List[str] = Field(default_factory=list)
+    missing: List[str] = Field(default_factory=list)
+
+
+class CertificationAnalysis(BaseModel):
+    required_certifications: CertificationMatch = Field(default_factory=CertificationMatch)
+    preferred_certifications: CertificationMatch = Field(default_factory=CertificationMatch)
+    additional_certifications: List[str] = Field(default_factory=list)
+
+
+class Gap(BaseModel):
+    category: str = ""
+    gap: str = ""
+    severity: str = Field("", description="Critical/High/Medium/Low")
+    addressable: bool = False
+    suggestions: List[str] = Field(default_factory=list)
+
+
+class Strength(BaseModel):
+    category: str = ""
+    strength: str = ""
+    value: str = ""
+    leverage_suggestion: str = ""
+
+
+class Recommendation(BaseModel):
+    type: str = ""
+    priority: str = Field("", description="High/Medium/Low")
+    description: str = ""
+    section: str = ""
+
+
+class MatchScoreBreakdown(BaseModel):
+    skills_weight: float = 40
+    experience_weight: float = 30
+    education_weight: float = 15
+    keywords_weight: float = 15
+    skills_score: float = 0.0
+    experience_score: float = 0.0
+    education_score: float = 0.0
+    keywords_score: float = 0.0
+
+
+class ATSCompatibility(BaseModel):
+    current_score: int = 0
+    improvements_needed: List[str] = Field(default_factory=list)
+    keyword_optimization: str = ""
+
+
+class CompetitiveAnalysis(BaseModel):
+    candidate_positioning: str = ""
+    standout_factors: List[str] = Field(default_factory=list)
+    areas_for_improvement: List[str] = Field(default_factory=list)
+
+
+class MatchAnalysis(BaseModel):
+    """Resume vs. job requirements: overlap, gaps, strengths and recommendations"""
+    overall_match_percentage: float = Field(ge=0, le=100)
+    detailed_skill_match: DetailedSkillMatch = Field(default_factory=DetailedSkillMatch)
+    experience_analysis: ExperienceAnalysis = Field(default_factory=ExperienceAnalysis)
+    education_analysis: EducationAnalysis = Field(default_factory=EducationAnalysis)
+    keyword_analysis: KeywordAnalysis = Field(default_factory=KeywordAnalysis)
+    certification_analysis: CertificationAnalysis = Field(default_factory=CertificationAnalysis)
+    gaps_identified: List[Gap]
+    strengths_identified: List[Strength] = Field(default_factory=list)
+    recommendations: List[Recommendation] = Field(default_factory=list)
+    match_score_breakdown: MatchScoreBreakdown = Field(default_factory=MatchScoreBreakdown)
+    ats_compatibility: ATSCompatibility = Field(default_factory=ATSCompatibility)
+    competitive_analysis: CompetitiveAnalysis = Field(default_factory=CompetitiveAnalysis)
+
+
+# match_analysis_node asks for MatchAnalysis as two halves generated concurrently
+
+class SkillsExperienceMatch(BaseModel):
+    """Skills, experience and education overlap, with the gaps, strengths and recommendations"""
+    overall_match_percentage: float = Field(ge=0, le=100)
+    detailed_skill_match: DetailedSkillMatch = Field(default_factory=DetailedSkillMatch)
+    experience_analysis: ExperienceAnalysis = Field(default_factory=ExperienceAnalysis)
+    education_analysis: EducationAnalysis = Field(default_factory=EducationAnalysis)
+    gaps_identified: List[Gap]
+    strengths_identified: List[Strength] = Field(default_factory=list)
+    recommendations: List[Recommendation] = Field(default_factory=list)
+    match_score_breakdown: MatchScoreBreakdown = Field(default_factory=MatchScoreBreakdown)
+
+
+class KeywordsATSMatch(BaseModel):
+    """Keyword, certification and ATS coverage, and competitive positioning"""
+    keyword_analysis: KeywordAnalysis = Field(default_factory=KeywordAnalysis)
+    certification_analysis: CertificationAnalysis = Field(default_factory=CertificationAnalysis)
+    ats_compatibility: ATSCompatibility = Field(default_factory=ATSCompatibility)
+    competitive_analysis: CompetitiveAnalysis = Field(default_factory=CompetitiveAnalysis)
+
+
+# Fused analysis (analyze_all_node)
+
+class FullAnalysis(BaseModel):
+    """Resume analysis, job description analysis and their match, produced in one response"""
+    resume_analysis: ResumeAnalysis = Field(default_factory=ResumeAnalysis)
+    jd_analysis: JDAnalysis = Field(default_factory=JDAnalysis)
+    match_analysis: MatchAnalysis
+
+
+# CV generation (generate_improved_cv_node)
+
+class CVChange(BaseModel):
+    section: str = ""
+    change_type: str = Field("", description="Added/Modified/Restructured/Enhanced")
+    original: str = Field("", description="Original text or 'N/A' if new")
+    improved: str = ""
+    reason: str = ""
+    addresses_gap: str = ""
+
+
+class CVGeneration(BaseModel):
+    """Improved resume text plus a record of every change made"""
+    improved_resume_text: str = Field(min_length=1, description="Complete improved resume, plain text")
+    changes_made: List[CVChange] = Field(default_factory=list)
+    keywords_added: List[str] = Field(default_factory=list)
+    ats_improvements: List[str] = Field(default_factory=list)
+    sections_restructured: List[str] = Field(default_factory=list)
+
+
+# User feedback (apply_user_feedback_node)
+
+class FeedbackChange(BaseModel):
+    feedback_item: str = ""
+    section: str = ""
+    change_type: str = Field("", description="Added/Modified/Removed/Restructured")
+    original: str = ""
+    updated: str = ""
+    reasoning: str = ""
+
+
+class FeedbackNotApplied(BaseModel):
+    feedback_item: str = ""
+    reason: str = ""
+
+
+class FeedbackResult(BaseModel):
+    """Resume with the user's feedback applied, and what was (not) applied"""
+    final_resume_text: Optional[str] = None
+    feedback_changes: List[FeedbackChange] = Field(default_factory=list)
+    feedback_not_applied: List[FeedbackNotApplied] = Field(default_factory=list)
+
+
+# Final analysis (final_analysis_node)
+
+class FinalMatchAnalysis(BaseModel):
+    overall_match_percentage: float = Field(ge=0, le=100)
+    improvement_from_original: float = 0.0
+    skill_match_percentage: float = 0.0
+    experience_match_percentage: float = 0.0
+    keyword_match_percentage: float = 0.0
+    education_match_percentage: float = 0.0
+
+
+class ATSCompliance(BaseModel):
+    """ATS view of the final CV
+
+    final_score and improvement_from_original are overwritten with the measured ATS score
+    by final_analysis_node; the remaining fields are the model's estimate from the CV text.
+    """
+    final_score: int = Field(0, description="Overwritten with the measured ATS score")
+    improvement_from_original: int = Field(0, description="Overwritten from the measured ATS scores")
+    strong_areas: List[str] = Field(default_factory=list, description="Estimate, not measured")
+    areas_for_improvement: List[str] = Field(default_factory=list, description="Estimate, not measured")
+    keyword_optimization_score: int = Field(0, description="Estimate (0-100), not measured")
+
+
+class AddressedGap(BaseModel):
+    gap: str = ""
+    how_addressed: str = ""
+    effectiveness: str = Field("", description="High/Medium/Low")
+
+
+class RemainingGap(BaseModel):
+    gap: str = ""
+    reason: str = ""
+    mitigation: str = ""
+
+
+class GapsAnalysis(BaseModel):
+    original_gaps: List[str] = Field(default_factory=list)
+    gaps_addressed: List[AddressedGap] = Field(default_factory=list)
+    remaining_gaps: List[RemainingGap] = Field(default_factory=list)
+
+
+class ImprovementSummary(BaseModel):
+    key_enhancements: List[str] = Field(default_factory=list)
+    sections_improved: List[str] = Field(default_factory=list)
+    new_strengths: List[str] = Field(default_factory=list)
+    competitive_advantage: str = ""
+
+
+class FinalRecommendations(BaseModel):
+    for_application: List[str] = Field(default_factory=list)
+    for_interview: List[str] = Field(default_factory=list)
+    for_further_improvement: List[str] = Field(default_factory=list)
+
+
+class FinalAnalysis(BaseModel):
+    """Final CV vs. job requirements, and how much it improved on the original"""
+    final_match_analysis: FinalMatchAnalysis
+    ats_compliance: ATSCompliance = Field(default_factory=ATSCompliance)
+    gaps_analysis: GapsAnalysis
+    improvement_summary: ImprovementSummary = Field(default_factory=ImprovementSummary)
+    recommendations: FinalRecommendations = Field(default_factory=FinalRecommendations)
@@ -1,5 +1,6 @@
+import operator
 from typing import Annotated, Optional, Dict, List, Any
-from typing_extensions import TypedDict
+from pydantic import BaseModel, ConfigDict, Field
 from langchain_core.messages import BaseMessage
 
 # For newer versions of LangGraph, we may need to import add_messages differently
@@ -9,58 +10,78 @@ except ImportError:
     from langgraph.graph import add_messages
 
 
-class CVCreatorState(TypedDict):
-    messages: Annotated[list[BaseMessage], add_messages]
+# completed_steps bits - a producer node ORs in its bit once its output is accepted;
+# accepted outputs are never invalidated, so the bits only ever get set
+BIT_RESUME = 1
+BIT_JD = 2
+BIT_MATCH = 4
+BIT_CV = 8
+BIT_FINAL = 16
+BIT_FEEDBACK = 32
+
+
+class CVCreatorState(BaseModel):
+    # Attribute access (state.error) instead of dict probes on every node and router hop
+    model_config = ConfigDict(frozen=False, arbitrary_types_allowed=True)
+    
+    messages: Annotated[list[BaseMessage], add_messages] = Field(default_factory=list)
     
     # Document uploads
-    uploaded_resume: Optional[str]  # Resume content as text
-    job_description: Optional[str]  # JD content as text
+    uploaded_resume: Optional[str] = None  # Resume content as text
+    job_description: Optional[str] = None  # JD content as text
     
     # Analysis results
-    resume_analysis: Optional[Dict[str, Any]]  # Structured resume data
-    jd_analysis: Optional[Dict[str, Any]]  # Structured JD requirements
-    match_analysis: Optional[Dict[str, Any]]  # Match score and gaps
+    resume_analysis: Optional[Dict[str, Any]] = None  # Structured resume data
+    jd_analysis: Optional[Dict[str, Any]] = None  # Structured JD requirements
+    match_analysis: Optional[Dict[str, Any]] = None  # Match score and gaps
+    # Compact JSON of the three analyses, serialized once by the producing node for downstream prompts
+    resume_analysis_json: Optional[str] = None
+    jd_analysis_json: Optional[str] = None
+    match_analysis_json: Optional[str] = None
     
     # CV Generation
-    improved_cv: Optional[str]  # Generated improved CV content
-    final_cv: Optional[str]  # Final CV after user feedback
-    user_feedback: Optional[str]  # User modifications/feedback
+    improved_cv: Optional[str] = None  # Generated improved CV content
+    final_cv: Optional[str] = None  # Final CV after user feedback
+    user_feedback: Optional[str] = None  # User modifications/feedback
     
     # Processing state
-    current_step: str  # Track which step we're on
-    processing: bool  # UI loading state
-    error: Optional[str]  # Error messages
+    current_step: str = ""  # Track which step we're on
+    processing: bool = False  # UI loading state
+    error: Optional[str] = None  # Error messages
+    clients_ready: bool = False  # LLM clients configured - written once per run, read by the routers
+    completed_steps: Annotated[int, operator.or_] = 0  # BIT_* flags of accepted steps, checked by the routers
     
     # Results for UI
-    match_percentage: Optional[float]
-    identified_gaps: Optional[List[str]]
-    addressed_gaps: Optional[List[str]]
-    remaining_gaps: Optional[List[str]]
+    match_percentage: Optional[float] = None
+    identified_gaps: Optional[List[str]] = None
+    addressed_gaps: Optional[List[str]] = None
+    remaining_gaps: Optional[List[str]] = None
     
     # Enhanced features - NEW FIELDS NEEDED
     # ATS Compliance
-    ats_compliance_score: Optional[int]  # Original ATS score
-    final_ats_score: Optional[int]  # Final ATS score after improvements
-    ats_improvement: Optional[int]  # ATS score improvement
-    ats_feedback: Optional[List[str]]  # ATS improvement suggestions
+    ats_compliance_score: Optional[int] = None  # Original ATS score
+    final_ats_score: Optional[int] = None  # Final ATS score after improvements
+    ats_improvement: Optional[int] = None  # ATS score improvement
+    ats_feedback: Optional[List[str]] = None  # ATS improvement suggestions
     
     # Detailed Analysis
-    gap_details: Optional[List[Dict[str, Any]]]  # Detailed gap analysis with severity
-    strengths: Optional[List[Dict[str, Any]]]  # Identified strengths
-    recommendations: Optional[List[Dict[str, Any]]]  # Improvement recommendations
+    gap_details: Optional[List[Dict[str, Any]]] = None  # Detailed gap analysis with severity
+    strengths: Optional[List[Dict[str, Any]]] = None  # Identified strengths
+    recommendations: Optional[List[Dict[str, Any]]] = None  # Improvement recommendations
     
     # Change Tracking
-    changes_made: Optional[List[Dict[str, Any]]]  # Detailed changes made to CV
-    keywords_added: Optional[List[str]]  # Keywords added during improvement
-    ats_improvements: Optional[List[str]]  # ATS-specific improvements made
-    sections_restructured: Optional[List[str]]  # Sections that were reorganized
+    changes_made: Optional[List[Dict[str, Any]]] = None  # Detailed changes made to CV
+    keywords_added: Optional[List[str]] = None  # Keywords added during improvement
+    ats_improvements: Optional[List[str]] = None  # ATS-specific improvements made
+    sections_restructured: Optional[List[str]] = None  # Sections that were reorganized
     
     # User Feedback Integration
-    user_feedback_applied: Optional[List[Dict[str, Any]]]  # Feedback changes applied
-    feedback_not_applied: Optional[List[Dict[str, Any]]]  # Feedback that couldn't be applied
-    user_feedback_text: Optional[str]  # Original user feedback text
+    user_feedback_applied: Optional[List[Dict[str, Any]]] = None  # Feedback changes applied
+    feedback_not_applied: Optional[List[Dict[str, Any]]] = None  # Feedback that couldn't be applied
+    user_feedback_text: Optional[str] = None  # Original user feedback text
+    trivial_feedback: bool = False  # Feedback was a plain approval, applied without an LLM call
     
     # Final Analysis
-    final_match_percentage: Optional[float]  # Final match score after all improvements
-    improvement_summary: Optional[Dict[str, Any]]  # Summary of all improvements made
-    final_analysis: Optional[Dict[str, Any]]  # Comprehensive final analysis
\ No newline at end of file
+    final_match_percentage: Optional[float] = None  # Final match score after all improvements
+    improvement_summary: Optional[Dict[str, Any]] = None  # Summary of all improvements made
+    final_analysis: Optional[Dict[str, Any]] = None  # Comprehensive final analysis
\ No newline at end of file
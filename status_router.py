@@ -0,0 +1,54 @@
+import orjson
+from fastapi import APIRouter, Response
+
+from cv_agent.chat_app import get_status_tuple
+
+# Status endpoints, registered once at import and mounted by create_app
+router = APIRouter()
+
+# Pre-encoded constant parts of the status payloads
+_LLM_STATUS_TAIL = orjson.dumps({"supported_providers": ["openai", "gemini"]})[1:]
+_AGENT_STATUS_BODIES = {
+    (agent_initialized, llm_ready): orjson.dumps({
+        "agent_initialized": agent_initialized,
+        "agent_type": "LangGraph CV Creator Enhanced" if agent_initialized else None,
+        "llm_ready": llm_ready,
+        "ready_for_processing": agent_initialized and llm_ready
+    })
+    for agent_initialized in (False, True)
+    for llm_ready in (False, True)
+}
+
+
+# Health check endpoint
+@router.get("/health")
+async def health_check():
+    agent, llm_initialized, current_provider = get_status_tuple()
+    return {
+        "status": "healthy",
+        "service": "cv-creator-agent-enhanced",
+        "version": "2.0.0",
+        "agent_initialized": agent is not None,
+        "llm_initialized": llm_initialized,
+        "current_provider": current_provider
+    }
+
+
+# LLM status endpoint
+@router.get("/llm/status")
+async def llm_status():
+    _, llm_initialized, current_provider = get_status_tuple()
+    body = (
+        b'{"llm_initialized":' + orjson.dumps(llm_initialized)
+        + b',"current_provider":' + orjson.dumps(current_provider)
+        + b',' + _LLM_STATUS_TAIL
+    )
+    return Response(content=body, media_type="application/json")
+
+
+# Agent status endpoint
+@router.get("/agent/status")
+async def agent_status():
+    agent, llm_ready, _ = get_status_tuple()
+    agent_initialized = agent is not None
+    return Response(content=_AGENT_STATUS_BODIES[agent_initialized, llm_ready], media_type="application/json")